@@ -1,6 +1,67 @@
 """Day 1: Historian Hysteria"""
 
-from typing import Collection, Counter, Generator, Iterable, Sequence, Tuple
+import heapq
+import itertools
+import math
+import operator
+import os
+import tempfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from typing import (
+    BinaryIO,
+    Collection,
+    Counter,
+    Final,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    MutableSequence,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, and only required by the `*_numpy` functions
+    np = None  # type: ignore[assignment]
+
+# Constants
+DEFAULT_RUN_SIZE: Final[int] = 1_000_000
+DEFAULT_FAN_IN: Final[int] = 64
+RUN_TYPECODE: Final[str] = "q"
+COUNTING_TYPECODE: Final[str] = "I"
+COLUMN_TYPECODE: Final[str] = "q"
+MAX_COUNTING_RANGE: Final[int] = 1 << 20
+CHUNKS_PER_WORKER: Final[int] = 4
+LOCATION_ID_RANGE: Final[int] = 100_000
+
+
+class Solution(NamedTuple):
+    """Answers to both parts of the puzzle"""
+
+    total_distance: int
+    similarity_score: int
+
+
+class Run(NamedTuple):
+    """A sorted run of values, stored from byte `offset` of a spill file"""
+
+    offset: int
+    length: int
+
+
+class Chunk(NamedTuple):
+    """Partial aggregates for a chunk of the input file (mergeable with others)"""
+
+    locations_lhs: Sequence[int]
+    locations_rhs: Sequence[int]
+    location_counts: Counter[int]
 
 
 def read_input() -> Generator[Tuple[int, int], None, None]:
@@ -16,11 +77,8 @@ def read_input() -> Generator[Tuple[int, int], None, None]:
             yield lhs, rhs
 
 
-def main() -> None:
-    """Solution for AoC 2024, Day 1, Parts 1 & 2"""
-
-    # Load the entire dataset into memory
-    inputs: Collection[Tuple[int, int]] = tuple(read_input())
+def solve(inputs: Iterable[Tuple[int, int]], /) -> Solution:
+    """Solve both parts for the given (x, y) pairs"""
 
     # Split into columns and sort
     locations_lhs: Sequence[int]
@@ -34,8 +92,6 @@ def main() -> None:
         abs(lhs - rhs) for lhs, rhs in zip(locations_lhs, locations_rhs)
     )
 
-    print("Total Distance:", total_distance)
-
     # --- Part Two ---
 
     # Count the number of occurences of each value in the rhs column
@@ -46,7 +102,620 @@ def main() -> None:
         value * location_counts[value] for value in locations_lhs
     )
 
-    print("Similarity Score:", similarity_score)
+    return Solution(total_distance, similarity_score)
+
+
+def read_input_numpy(path: str = "input", /) -> "np.ndarray":
+    """
+    Read and parse the input file straight into a (2, n) int64 array
+
+    Row 0 holds the lhs column and row 1 the rhs column, each contiguous in memory
+    so that they can be sorted in place without any intermediate Python objects.
+    """
+
+    assert np is not None, "NumPy is required for the NumPy-backed mode"
+
+    # The input is nothing but whitespace-separated integers, so let NumPy's
+    # C parser consume the whole file in one go.
+    values: np.ndarray = np.fromfile(path, dtype=np.int64, sep=" ")
+
+    assert values.size % 2 == 0, "Input contains an odd number of location IDs"
+
+    return values.reshape(-1, 2).T.copy()
+
+
+def get_total_distance_numpy(lhs: "np.ndarray", rhs: "np.ndarray", /) -> int:
+    """Total distance between two (sorted) columns of locations"""
+
+    return int(np.abs(lhs - rhs).sum())
+
+
+def get_similarity_score_numpy(lhs: "np.ndarray", rhs: "np.ndarray", /) -> int:
+    """Total "similarity score" of the lhs column against the rhs column"""
+
+    if not lhs.size or not rhs.size:
+        return 0
+
+    # Equivalent of `Counter(rhs)`: the distinct values (sorted) and their counts
+    values: np.ndarray
+    counts: np.ndarray
+    values, counts = np.unique(rhs, return_counts=True)
+
+    # Look up each lhs value amongst the distinct rhs values. Values which don't
+    # appear in the rhs column have a count of zero.
+    indices: np.ndarray = np.minimum(np.searchsorted(values, lhs), values.size - 1)
+    lhs_counts: np.ndarray = np.where(values[indices] == lhs, counts[indices], 0)
+
+    return int((lhs * lhs_counts).sum())
+
+
+def solve_numpy(path: str = "input", /) -> Solution:
+    """Solve both parts using vectorised NumPy operations"""
+
+    columns: np.ndarray = read_input_numpy(path)
+
+    # Sort both columns in place
+    columns.sort(axis=1)
+
+    locations_lhs: np.ndarray
+    locations_rhs: np.ndarray
+    locations_lhs, locations_rhs = columns
+
+    return Solution(
+        total_distance=get_total_distance_numpy(locations_lhs, locations_rhs),
+        similarity_score=get_similarity_score_numpy(locations_lhs, locations_rhs),
+    )
+
+
+def _spill_run(
+    values: List[int], spill: BinaryIO, runs: MutableSequence[Run], /
+) -> None:
+    """Sort the given values and append them to a spill file as a new run"""
+
+    values.sort()
+
+    spill.seek(0, os.SEEK_END)
+    runs.append(Run(spill.tell(), len(values)))
+
+    array(RUN_TYPECODE, values).tofile(spill)
+
+
+def _read_run(
+    spill: BinaryIO, run: Run, /, *, buffer_size: int
+) -> Generator[int, None, None]:
+    """Lazily read back a (sorted) run, `buffer_size` values at a time"""
+
+    offset: int = run.offset
+    remaining: int = run.length
+
+    while remaining:
+        buffer: array = array(RUN_TYPECODE)
+
+        # Other runs may be read from the same file in between, so seek every time
+        spill.seek(offset)
+        buffer.fromfile(spill, min(buffer_size, remaining))
+
+        offset += len(buffer) * buffer.itemsize
+        remaining -= len(buffer)
+
+        yield from buffer
+
+
+def _merge_runs(
+    spill: BinaryIO, runs: Sequence[Run], /, *, run_size: int
+) -> Iterator[int]:
+    """K-way merge the given sorted runs into a single sorted stream"""
+
+    # Share the memory budget of one run between the read buffers of all runs
+    buffer_size: int = max(1, run_size // max(1, len(runs)))
+
+    return heapq.merge(
+        *(_read_run(spill, run, buffer_size=buffer_size) for run in runs)
+    )
+
+
+def _reduce_runs(
+    spill: BinaryIO,
+    runs: MutableSequence[Run],
+    stack: ExitStack,
+    /,
+    *,
+    run_size: int,
+    fan_in: int,
+) -> Tuple[BinaryIO, MutableSequence[Run]]:
+    """
+    Merge runs `fan_in` at a time (into a new spill file), until at most `fan_in`
+    remain, so that the final merge never has too many runs to buffer
+    """
+
+    while len(runs) > fan_in:
+        merged: BinaryIO = stack.enter_context(tempfile.TemporaryFile())
+        merged_runs: MutableSequence[Run] = []
+
+        # Split the memory budget between the reads & the write buffer
+        buffer_size: int = max(1, run_size // 2)
+
+        start: int
+        for start in range(0, len(runs), fan_in):
+            group: Sequence[Run] = runs[start : start + fan_in]
+            merged_runs.append(Run(merged.tell(), sum(run.length for run in group)))
+
+            buffer: array = array(RUN_TYPECODE)
+
+            value: int
+            for value in _merge_runs(spill, group, run_size=buffer_size):
+                buffer.append(value)
+
+                if len(buffer) >= buffer_size:
+                    buffer.tofile(merged)
+                    buffer = array(RUN_TYPECODE)
+
+            buffer.tofile(merged)
+
+        # The previous pass is no longer needed, so release it straight away
+        spill.close()
+        spill, runs = merged, merged_runs
+
+    return spill, runs
+
+
+def _merge_join_similarity(lhs: Iterator[int], rhs: Iterator[int], /) -> int:
+    """Compute the "similarity score" by merge-joining two sorted streams"""
+
+    similarity_score: int = 0
+
+    groups_lhs: Iterator[Tuple[int, Iterator[int]]] = itertools.groupby(lhs)
+    groups_rhs: Iterator[Tuple[int, Iterator[int]]] = itertools.groupby(rhs)
+
+    value_lhs: int
+    value_rhs: int
+    group_lhs: Iterator[int]
+    group_rhs: Iterator[int]
+
+    try:
+        value_lhs, group_lhs = next(groups_lhs)
+        value_rhs, group_rhs = next(groups_rhs)
+
+        while True:
+            if value_lhs < value_rhs:
+                value_lhs, group_lhs = next(groups_lhs)
+            elif value_lhs > value_rhs:
+                value_rhs, group_rhs = next(groups_rhs)
+            else:
+                count_lhs: int = sum(1 for _ in group_lhs)
+                count_rhs: int = sum(1 for _ in group_rhs)
+
+                similarity_score += value_lhs * count_lhs * count_rhs
+
+                value_lhs, group_lhs = next(groups_lhs)
+                value_rhs, group_rhs = next(groups_rhs)
+    except StopIteration:
+        # One of the streams is exhausted, so there can be no further matches
+        pass
+
+    return similarity_score
+
+
+def solve_streaming(
+    inputs: Iterable[Tuple[int, int]],
+    /,
+    *,
+    run_size: int = DEFAULT_RUN_SIZE,
+    fan_in: int = DEFAULT_FAN_IN,
+) -> Solution:
+    """
+    Solve both parts using an external merge sort
+
+    Each column is sorted in runs of at most `run_size` values which are spilled
+    to a temporary file (one per column), and then k-way merged back together, in
+    intermediate passes of at most `fan_in` runs if there are more. Peak memory is
+    therefore bounded by `run_size` (per column), rather than by the input size.
+    """
+
+    assert run_size > 0, "Run size must be positive"
+    assert fan_in > 1, "Fan-in must be at least 2"
+
+    runs_lhs: MutableSequence[Run] = []
+    runs_rhs: MutableSequence[Run] = []
+
+    stack: ExitStack
+    with ExitStack() as stack:
+        spill_lhs: BinaryIO = stack.enter_context(tempfile.TemporaryFile())
+        spill_rhs: BinaryIO = stack.enter_context(tempfile.TemporaryFile())
+
+        # Split into columns, sorting and spilling each column a run at a time
+        buffer_lhs: List[int] = []
+        buffer_rhs: List[int] = []
+
+        lhs: int
+        rhs: int
+        for lhs, rhs in inputs:
+            buffer_lhs.append(lhs)
+            buffer_rhs.append(rhs)
+
+            if len(buffer_lhs) >= run_size:
+                _spill_run(buffer_lhs, spill_lhs, runs_lhs)
+                _spill_run(buffer_rhs, spill_rhs, runs_rhs)
+
+                buffer_lhs.clear()
+                buffer_rhs.clear()
+
+        if buffer_lhs:
+            _spill_run(buffer_lhs, spill_lhs, runs_lhs)
+            _spill_run(buffer_rhs, spill_rhs, runs_rhs)
+
+        del buffer_lhs, buffer_rhs
+
+        spill_lhs, runs_lhs = _reduce_runs(
+            spill_lhs, runs_lhs, stack, run_size=run_size, fan_in=fan_in
+        )
+        spill_rhs, runs_rhs = _reduce_runs(
+            spill_rhs, runs_rhs, stack, run_size=run_size, fan_in=fan_in
+        )
+
+        # --- Part One ---
+
+        # Merge both columns in lockstep, accumulating the distance as we go
+        total_distance: int = sum(
+            abs(lhs - rhs)
+            for lhs, rhs in zip(
+                _merge_runs(spill_lhs, runs_lhs, run_size=run_size // 2),
+                _merge_runs(spill_rhs, runs_rhs, run_size=run_size // 2),
+            )
+        )
+
+        # --- Part Two ---
+
+        # Merge both columns again, this time joining equal values together
+        similarity_score: int = _merge_join_similarity(
+            _merge_runs(spill_lhs, runs_lhs, run_size=run_size // 2),
+            _merge_runs(spill_rhs, runs_rhs, run_size=run_size // 2),
+        )
+
+    return Solution(total_distance, similarity_score)
+
+
+def _build_histogram(values: Iterable[int], low: int, size: int, /) -> array:
+    """Count the occurrences of each value in the key range [low, low + size)"""
+
+    histogram: array = array(COUNTING_TYPECODE, [0]) * size
+
+    value: int
+    for value in values:
+        histogram[value - low] += 1
+
+    return histogram
+
+
+def _expand_histogram(histogram: array, low: int, /) -> Iterator[int]:
+    """Lazily expand a histogram back into the (sorted) values it counts"""
+
+    return itertools.chain.from_iterable(
+        map(itertools.repeat, range(low, low + len(histogram)), histogram)
+    )
+
+
+def solve_counting(
+    inputs: Iterable[Tuple[int, int]], /, *, max_range: int = MAX_COUNTING_RANGE
+) -> Solution:
+    """
+    Solve both parts using a counting sort
+
+    If the location IDs span no more than `max_range` distinct keys, a histogram of
+    each column is built, which serves both to sort the column and to look up the
+    counts required by the "similarity score", in O(n + range). Otherwise, this
+    falls back to the comparison-sort based `solve`.
+    """
+
+    # Split into compact (signed 64-bit) columns
+    locations_lhs: array = array(COLUMN_TYPECODE)
+    locations_rhs: array = array(COLUMN_TYPECODE)
+
+    pairs: Iterator[Tuple[int, int]] = iter(inputs)
+
+    lhs: int
+    rhs: int
+    for lhs, rhs in pairs:
+        try:
+            locations_lhs.append(lhs)
+            locations_rhs.append(rhs)
+        except OverflowError:
+            # Far too wide a range to count, so sort everything (read so far) instead
+            return solve(
+                itertools.chain(zip(locations_lhs, locations_rhs), ((lhs, rhs),), pairs)
+            )
+
+    if not locations_lhs:
+        return Solution(0, 0)
+
+    # Detect the key range
+    low: int = min(min(locations_lhs), min(locations_rhs))
+    high: int = max(max(locations_lhs), max(locations_rhs))
+    size: int = high - low + 1
+
+    if size > max_range:
+        return solve(zip(locations_lhs, locations_rhs))
+
+    histogram_lhs: array = _build_histogram(locations_lhs, low, size)
+    histogram_rhs: array = _build_histogram(locations_rhs, low, size)
+
+    # --- Part One ---
+
+    # Total distance between all (sorted) locations
+    total_distance: int = sum(
+        map(
+            abs,
+            map(
+                operator.sub,
+                _expand_histogram(histogram_lhs, low),
+                _expand_histogram(histogram_rhs, low),
+            ),
+        )
+    )
+
+    # --- Part Two ---
+
+    # Each value contributes `value * count_lhs * count_rhs`
+    similarity_score: int = sum(
+        map(
+            operator.mul,
+            range(low, high + 1),
+            map(operator.mul, histogram_lhs, histogram_rhs),
+        )
+    )
+
+    return Solution(total_distance, similarity_score)
+
+
+def get_chunk_boundaries(path: str, chunks: int, /) -> Sequence[Tuple[int, int]]:
+    """Split a file into (up to) `chunks` byte ranges, each aligned to a newline"""
+
+    size: int = os.path.getsize(path)
+    offsets: MutableSequence[int] = [0]
+
+    file: BinaryIO
+    with open(path, "rb") as file:
+        index: int
+        for index in range(1, chunks):
+            # Jump to the approximate offset, then skip ahead to the start of the
+            # next line. Starting one byte early means that an offset which already
+            # falls on the start of a line stays where it is.
+            file.seek(max(0, size * index // chunks - 1))
+            file.readline()
+
+            offset: int = min(file.tell(), size)
+
+            if offsets[-1] < offset < size:
+                offsets.append(offset)
+
+    return tuple(zip(offsets, (*offsets[1:], size)))
+
+
+def parse_chunk(path: str, start: int, end: int, /) -> Chunk:
+    """Parse the byte range [start, end) of a file into sorted runs & rhs counts"""
+
+    file: BinaryIO
+    with open(path, "rb") as file:
+        file.seek(start)
+        data: bytes = file.read(end - start)
+
+    values: Sequence[int] = tuple(map(int, data.split()))
+
+    locations_lhs: Sequence[int] = sorted(values[0::2])
+    locations_rhs: Sequence[int] = sorted(values[1::2])
+
+    return Chunk(locations_lhs, locations_rhs, Counter(locations_rhs))
+
+
+def solve_parallel(
+    path: str = "input", /, *, workers: Optional[int] = None
+) -> Solution:
+    """
+    Solve both parts by parsing newline-aligned chunks of the input in parallel
+
+    Each worker process returns a sorted run of each column and a partial count of
+    the rhs column, which are then merged (and summed) by the parent process.
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    boundaries: Sequence[Tuple[int, int]] = get_chunk_boundaries(
+        path, workers * CHUNKS_PER_WORKER
+    )
+
+    executor: ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks: Collection[Chunk] = tuple(
+            executor.map(
+                parse_chunk,
+                itertools.repeat(path),
+                *zip(*boundaries),
+            )
+        )
+
+    # Sum the partial counts of the rhs column
+    location_counts: Counter[int] = Counter()
+
+    chunk: Chunk
+    for chunk in chunks:
+        location_counts.update(chunk.location_counts)
+
+    # Merge the sorted runs of both columns in lockstep, accumulating both the
+    # distance (part one) and the "similarity score" (part two) as we go
+    total_distance: int = 0
+    similarity_score: int = 0
+
+    lhs: int
+    rhs: int
+    for lhs, rhs in zip(
+        heapq.merge(*(chunk.locations_lhs for chunk in chunks)),
+        heapq.merge(*(chunk.locations_rhs for chunk in chunks)),
+    ):
+        total_distance += abs(lhs - rhs)
+        similarity_score += lhs * location_counts[lhs]
+
+    return Solution(total_distance, similarity_score)
+
+
+@dataclass
+class LocationIndex:
+    """
+    Online index of location pairs, keeping both answers current as pairs arrive
+
+    The "similarity score" is `sum(value * count_lhs[value] * count_rhs[value])`,
+    so it is updated in O(1) from per-value counts of each column.
+
+    The total distance between the sorted columns is equal to the sum of
+    `|C(x)|` over all keys `x`, where `C(x)` is the number of lhs locations `<= x`
+    minus the number of rhs locations `<= x`. Adding (or removing) a pair shifts
+    `C` by one over the keys between `lhs` and `rhs`, so `C` is stored in blocks of
+    `block_size` keys, each with a lazy offset, a histogram of its values and a
+    count of its negative values. Whole blocks are then shifted in O(1), giving
+    O(sqrt(key_range)) per update with the default block size.
+
+    All location IDs must lie in the range [0, key_range).
+    """
+
+    key_range: int = LOCATION_ID_RANGE
+    block_size: int = 0
+
+    total_distance: int = field(default=0, init=False)
+    similarity_score: int = field(default=0, init=False)
+
+    counts_lhs: Counter[int] = field(default_factory=Counter, init=False)
+    counts_rhs: Counter[int] = field(default_factory=Counter, init=False)
+
+    _differences: MutableSequence[int] = field(default_factory=list, init=False)
+    _offsets: MutableSequence[int] = field(default_factory=list, init=False)
+    _negatives: MutableSequence[int] = field(default_factory=list, init=False)
+    _histograms: MutableSequence[Counter[int]] = field(default_factory=list, init=False)
+
+    def __post_init__(self) -> None:
+        assert self.key_range > 0, "Key range must be positive"
+
+        if self.block_size <= 0:
+            self.block_size = max(1, math.isqrt(self.key_range))
+
+        self._differences = [0] * self.key_range
+
+        block_start: int
+        for block_start in range(0, self.key_range, self.block_size):
+            block_end: int = min(block_start + self.block_size, self.key_range)
+
+            self._offsets.append(0)
+            self._negatives.append(0)
+            self._histograms.append(Counter({0: block_end - block_start}))
+
+    def __len__(self) -> int:
+        return self.counts_lhs.total()
+
+    @property
+    def solution(self) -> Solution:
+        """Current answers to both parts of the puzzle"""
+
+        return Solution(self.total_distance, self.similarity_score)
+
+    def add(self, lhs: int, rhs: int, /) -> None:
+        """Add a pair of locations to the index"""
+
+        self._check_key(lhs)
+        self._check_key(rhs)
+
+        self.similarity_score += lhs * self.counts_rhs[lhs]
+        self.counts_lhs[lhs] += 1
+
+        self.similarity_score += rhs * self.counts_lhs[rhs]
+        self.counts_rhs[rhs] += 1
+
+        self._shift(lhs, rhs)
+
+    def remove(self, lhs: int, rhs: int, /) -> None:
+        """Remove a (previously added) pair of locations from the index"""
+
+        if not self.counts_lhs[lhs]:
+            raise KeyError(f"Location {lhs} not present in the lhs column")
+        if not self.counts_rhs[rhs]:
+            raise KeyError(f"Location {rhs} not present in the rhs column")
+
+        self.counts_lhs[lhs] -= 1
+        self.similarity_score -= lhs * self.counts_rhs[lhs]
+
+        self.counts_rhs[rhs] -= 1
+        self.similarity_score -= rhs * self.counts_lhs[rhs]
+
+        self._shift(rhs, lhs)
+
+    def _check_key(self, key: int, /) -> None:
+        if not 0 <= key < self.key_range:
+            raise ValueError(f"Location {key} outside of key range {self.key_range}")
+
+    def _shift(self, lhs: int, rhs: int, /) -> None:
+        """Account for an lhs location being added and an rhs location removed"""
+
+        # `C` increases by one over [lhs, rhs), or decreases by one over [rhs, lhs)
+        delta: int = 1 if lhs < rhs else -1
+        start: int = min(lhs, rhs)
+        end: int = max(lhs, rhs)
+
+        while start < end:
+            block: int = start // self.block_size
+            block_start: int = block * self.block_size
+            block_end: int = min(block_start + self.block_size, self.key_range)
+
+            if start == block_start and end >= block_end:
+                self._shift_block(block, block_end - block_start, delta)
+            else:
+                block_end = min(block_end, end)
+
+                key: int
+                for key in range(start, block_end):
+                    self._shift_key(block, key, delta)
+
+            start = block_end
+
+    def _shift_block(self, block: int, size: int, delta: int, /) -> None:
+        offset: int = self._offsets[block]
+        histogram: Counter[int] = self._histograms[block]
+
+        if delta > 0:
+            # Every value >= 0 moves away from zero, every negative value towards it
+            self.total_distance += size - 2 * self._negatives[block]
+            self._negatives[block] -= histogram[-1 - offset]
+        else:
+            # Every value <= 0 moves away from zero, every positive value towards it
+            non_positives: int = self._negatives[block] + histogram[-offset]
+
+            self.total_distance += 2 * non_positives - size
+            self._negatives[block] = non_positives
+
+        self._offsets[block] = offset + delta
+
+    def _shift_key(self, block: int, key: int, delta: int, /) -> None:
+        offset: int = self._offsets[block]
+        histogram: Counter[int] = self._histograms[block]
+
+        old: int = self._differences[key]
+        new: int = old + delta
+
+        histogram[old] -= 1
+        histogram[new] += 1
+        self._differences[key] = new
+
+        self.total_distance += abs(new + offset) - abs(old + offset)
+        self._negatives[block] += (new + offset < 0) - (old + offset < 0)
+
+
+def main() -> None:
+    """Solution for AoC 2024, Day 1, Parts 1 & 2"""
+
+    # Load the entire dataset into memory
+    inputs: Collection[Tuple[int, int]] = tuple(read_input())
+
+    solution: Solution = solve(inputs)
+
+    print("Total Distance:", solution.total_distance)
+    print("Similarity Score:", solution.similarity_score)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,58 @@
+"""Day 1: Historian Hysteria (Benchmarks)"""
+
+import random
+import timeit
+from typing import Callable, Collection, Final, Iterable, Mapping, Sequence, Tuple
+
+from app import Solution, read_input, solve, solve_counting
+
+# Constants
+REPEAT: Final[int] = 5
+SYNTHETIC_SIZES: Final[Sequence[int]] = (10_000, 100_000, 1_000_000)
+SYNTHETIC_RANGE: Final[Tuple[int, int]] = (10_000, 99_999)
+
+SOLVERS: Final[Mapping[str, Callable[[Iterable[Tuple[int, int]]], Solution]]] = {
+    "sorted + Counter": solve,
+    "counting sort": solve_counting,
+}
+
+
+def generate_inputs(size: int, /) -> Collection[Tuple[int, int]]:
+    """Generate `size` random pairs of fixed-width (5-digit) location IDs"""
+
+    return tuple(
+        (random.randint(*SYNTHETIC_RANGE), random.randint(*SYNTHETIC_RANGE))
+        for _ in range(size)
+    )
+
+
+def benchmark(name: str, inputs: Collection[Tuple[int, int]], /) -> None:
+    """Time each solver against the given inputs, printing the best of `REPEAT`"""
+
+    print(f"{name} ({len(inputs):,} pairs)")
+
+    solutions: Collection[Solution] = {solver(inputs) for solver in SOLVERS.values()}
+    assert len(solutions) == 1, "Solvers disagree"
+
+    label: str
+    solver: Callable[[Iterable[Tuple[int, int]]], Solution]
+    for label, solver in SOLVERS.items():
+        seconds: float = min(
+            timeit.repeat(lambda: solver(inputs), number=1, repeat=REPEAT)
+        )
+
+        print(f"  {label:<20} {seconds * 1000:>10.2f} ms")
+
+
+def main() -> None:
+    """Benchmarks for AoC 2024, Day 1"""
+
+    benchmark("Puzzle input", tuple(read_input()))
+
+    size: int
+    for size in SYNTHETIC_SIZES:
+        benchmark("Synthetic", generate_inputs(size))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,40 @@
 """Day 2: Red-Nosed Reports"""
 
-from typing import Collection, Generator, Iterable, Optional, Sequence, TypeAlias
+import itertools
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import (
+    Collection,
+    Deque,
+    Generator,
+    Iterable,
+    MutableSequence,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeAlias,
+)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, and only required by the `*_numpy` functions
+    np = None  # type: ignore[assignment]
 
 Report: TypeAlias = Sequence[int]
 
 
+class Safety(str, Enum):
+    """Safety of a (partial) report"""
+
+    def __str__(self) -> str:
+        return self.value
+
+    SAFE = "safe"
+    DAMPENED = "safe with dampening"
+    UNSAFE = "unsafe"
+
+
 def read_input() -> Generator[Report, None, None]:
     """Lazily read and parse the input file into reports"""
 
@@ -129,6 +159,303 @@ def is_report_safe_2(
     return True
 
 
+def _is_step_safe(step: int, sign: int, /) -> bool:
+    """Determine whether the step between two adjacent levels is safe (for a sign)"""
+
+    return 1 <= step * sign <= 3
+
+
+def _find_unsafe_pair(report: Report, sign: int, /) -> Optional[int]:
+    """Find the index of the first unsafe pair in a report (for a sign), if any"""
+
+    index: int
+    for index in range(len(report) - 1):
+        if not _is_step_safe(report[index + 1] - report[index], sign):
+            return index
+
+    return None
+
+
+def _is_safe_without(report: Report, sign: int, skip: int, start: int, /) -> bool:
+    """Determine whether a report is safe from `start` onwards, ignoring `skip`"""
+
+    previous: Optional[int] = None
+
+    index: int
+    for index in range(start, len(report)):
+        if index == skip:
+            continue
+
+        if previous is not None and not _is_step_safe(
+            report[index] - report[previous], sign
+        ):
+            return False
+
+        previous = index
+
+    return True
+
+
+def _count_removals(report: Report, sign: int, limit: int, /) -> int:
+    """
+    Count the fewest levels that must be removed for a report to be safe (for a sign)
+
+    Dynamic program over the levels: the fewest removals for a safe report ending
+    with a given (kept) level follows from the best of the `limit + 1` levels before
+    it, as any larger gap would already exceed the `limit`. Results above the
+    `limit` are not exact.
+    """
+
+    length: int = len(report)
+    fewest_removals: int = min(length, limit + 1)
+
+    # (level, fewest removals ending with that level) for the most recent levels
+    recent: Deque[Tuple[int, int]] = deque(maxlen=limit + 1)
+
+    index: int
+    level: int
+    for index, level in enumerate(report):
+        # Either every level before this one is removed...
+        removals: int = index
+
+        # ...or this level follows on from a recent level, removing those between
+        gap: int
+        previous: int
+        previous_removals: int
+        for gap, (previous, previous_removals) in enumerate(reversed(recent)):
+            if _is_step_safe(level - previous, sign):
+                removals = min(removals, previous_removals + gap)
+
+        recent.append((level, removals))
+
+        # Remove every level after this one
+        fewest_removals = min(fewest_removals, removals + length - index - 1)
+
+    return fewest_removals
+
+
+def is_report_safe_dampened(report: Report, /, *, dampen: int = 1) -> bool:
+    """
+    Determine whether a report is considered safe (with dampening) in O(n * dampen)
+
+    By default, this is equivalent to `is_report_safe_2`, but without recursion or
+    allocation. For each direction, find the first unsafe pair: if there is one,
+    only removing either of its levels can make the report safe, and everything
+    before it is known to be safe, so each candidate removal is checked with a
+    single pass from that point.
+
+    Otherwise, up to `dampen` levels may be removed, as found by `_count_removals`.
+    """
+
+    sign: int
+
+    if dampen != 1:
+        return any(_count_removals(report, sign, dampen) <= dampen for sign in (1, -1))
+
+    for sign in (1, -1):
+        index: Optional[int] = _find_unsafe_pair(report, sign)
+
+        if index is None:
+            return True
+
+        if _is_safe_without(report, sign, index, max(0, index - 1)):
+            return True
+
+        if _is_safe_without(report, sign, index + 1, index):
+            return True
+
+    return False
+
+
+def pack_reports(reports: Collection[Report], /) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Pack reports into a zero-padded (reports x levels) int array, and their lengths
+    """
+
+    assert np is not None, "NumPy is required for the NumPy-backed mode"
+
+    lengths: np.ndarray = np.fromiter(
+        map(len, reports), dtype=np.int64, count=len(reports)
+    )
+    width: int = int(lengths.max(initial=0))
+
+    levels: np.ndarray = np.zeros((len(reports), width), dtype=np.int64)
+    levels[np.arange(width) < lengths[:, None]] = np.fromiter(
+        itertools.chain.from_iterable(reports), dtype=np.int64, count=int(lengths.sum())
+    )
+
+    return levels, lengths
+
+
+def _are_steps_safe_numpy(steps: "np.ndarray", sign: int, /) -> "np.ndarray":
+    """Element-wise equivalent of `_is_step_safe`"""
+
+    signed_steps: np.ndarray = steps * sign
+
+    return (signed_steps >= 1) & (signed_steps <= 3)
+
+
+def are_reports_safe_numpy(
+    levels: "np.ndarray", lengths: "np.ndarray", /, *, dampen: bool = False
+) -> "np.ndarray":
+    """
+    Determine which of a batch of (packed) reports are considered safe
+
+    With dampening, removing each level `k` is evaluated for all reports at once:
+    the pairs before `k` must all be safe (a running "all" from the left), as must
+    the pairs after it (a running "all" from the right), as must the new pair which
+    bridges the gap left by `k`.
+    """
+
+    size: int
+    width: int
+    size, width = levels.shape
+
+    safe: np.ndarray = np.zeros(size, dtype=bool)
+
+    if width < 2:
+        safe[:] = True
+        return safe
+
+    columns: np.ndarray = np.arange(width)
+
+    # Pairs (and bridging pairs) which run past the end of a report are ignored
+    is_padding: np.ndarray = columns[None, 1:] >= lengths[:, None]
+    is_bridge_padding: np.ndarray = columns[None, 2:] >= lengths[:, None]
+
+    steps: np.ndarray = np.diff(levels, axis=1)
+    bridging_steps: np.ndarray = levels[:, 2:] - levels[:, :-2]
+
+    edge: np.ndarray = np.ones((size, 1), dtype=bool)
+
+    sign: int
+    for sign in (1, -1):
+        is_safe_pair: np.ndarray = _are_steps_safe_numpy(steps, sign) | is_padding
+
+        # prefix[:, j] = whether pairs [0, j) are all safe (for j in [0, width))
+        prefix: np.ndarray = np.hstack(
+            (edge, np.logical_and.accumulate(is_safe_pair, axis=1))
+        )
+
+        safe |= prefix[:, -1]
+
+        if not dampen:
+            continue
+
+        # suffix[:, j] = whether pairs [j, width - 1) are all safe (j in [0, width])
+        suffix: np.ndarray = np.hstack(
+            (
+                np.logical_and.accumulate(is_safe_pair[:, ::-1], axis=1)[:, ::-1],
+                edge,
+                edge,
+            )
+        )
+
+        is_safe_bridge: np.ndarray = np.hstack(
+            (
+                edge,
+                _are_steps_safe_numpy(bridging_steps, sign) | is_bridge_padding,
+                edge,
+            )
+        )
+
+        # Removing level k keeps pairs [0, k - 1) and [k + 1, width - 1)
+        is_safe_without: np.ndarray = (
+            prefix[:, np.maximum(columns - 1, 0)]
+            & suffix[:, columns + 1]
+            & is_safe_bridge
+        )
+
+        safe |= is_safe_without.any(axis=1)
+
+    return safe
+
+
+@dataclass
+class _Direction:
+    """Feasible (dampener) states of a partial report, for one direction"""
+
+    sign: int
+
+    # Safe so far without removing any levels
+    clean: bool = True
+    # Safe so far having removed a level before the last level
+    dampened: bool = False
+    # Safe so far having removed the last level itself
+    dampened_last: bool = False
+
+    def push(self, previous: Optional[int], last: Optional[int], level: int) -> None:
+        """Advance the states by one level, given the two levels preceding it"""
+
+        is_safe_after_last: bool = last is None or _is_step_safe(
+            level - last, self.sign
+        )
+        is_safe_after_previous: bool = previous is None or _is_step_safe(
+            level - previous, self.sign
+        )
+
+        self.clean, self.dampened, self.dampened_last = (
+            self.clean and is_safe_after_last,
+            (self.dampened and is_safe_after_last)
+            or (self.dampened_last and is_safe_after_previous),
+            self.clean,
+        )
+
+
+@dataclass
+class ReportChecker:
+    """
+    Incremental safety checker for a report that arrives one level at a time
+
+    Keeps a constant-size state: the last two levels and, for each direction, which
+    ways of using the dampener (if at all) are still feasible. The report becomes
+    irrecoverably unsafe as soon as none are, after which levels are ignored.
+    """
+
+    dampen: bool = True
+
+    previous: Optional[int] = field(default=None, init=False)
+    last: Optional[int] = field(default=None, init=False)
+
+    _directions: MutableSequence[_Direction] = field(
+        default_factory=lambda: [_Direction(1), _Direction(-1)], init=False
+    )
+
+    @property
+    def safety(self) -> Safety:
+        """Safety of the report so far"""
+
+        direction: _Direction
+
+        if any(direction.clean for direction in self._directions):
+            return Safety.SAFE
+
+        if self.dampen and any(
+            direction.dampened or direction.dampened_last
+            for direction in self._directions
+        ):
+            return Safety.DAMPENED
+
+        return Safety.UNSAFE
+
+    def push(self, level: int, /) -> Safety:
+        """Add the next level of the report, returning its safety so far"""
+
+        safety: Safety = self.safety
+
+        # Once unsafe, no further levels can make the report safe again
+        if safety is Safety.UNSAFE:
+            return safety
+
+        direction: _Direction
+        for direction in self._directions:
+            direction.push(self.previous, self.last, level)
+
+        self.previous, self.last = self.last, level
+
+        return self.safety
+
+
 def main() -> None:
     """Solution for AoC 2024, Day 2, Parts 1 & 2"""
 
@@ -141,7 +468,7 @@ def main() -> None:
     assert total_safe_reports == 282
 
     # --- Part Two ---
-    total_safe_reports_with_dampening: int = sum(map(is_report_safe_2, inputs))
+    total_safe_reports_with_dampening: int = sum(map(is_report_safe_dampened, inputs))
     print("Total Safe Reports (With Dampening):", total_safe_reports_with_dampening)
     assert total_safe_reports_with_dampening == 349
 
@@ -0,0 +1,59 @@
+"""Day 2: Red-Nosed Reports (Benchmarks)"""
+
+import random
+import timeit
+from typing import Final, MutableSequence, Sequence
+
+from app import Report, is_report_safe_dampened
+
+# Constants
+REPEAT: Final[int] = 5
+DAMPENS: Final[Sequence[int]] = (2, 4, 8)
+LENGTHS: Final[Sequence[int]] = (1_000, 10_000, 100_000)
+
+
+def generate_report(length: int, faults: int, /) -> Report:
+    """Generate a safe (increasing) report of `length` levels, `faults` of them bad"""
+
+    levels: MutableSequence[int] = [0]
+
+    while len(levels) < length - faults:
+        levels.append(levels[-1] + random.randint(1, 3))
+
+    # Insert the bad levels, so that removing them leaves a safe report
+    _: int
+    for _ in range(faults):
+        levels.insert(random.randint(0, len(levels)), -1)
+
+    return levels
+
+
+def main() -> None:
+    """Benchmarks for AoC 2024, Day 2"""
+
+    print(f"{'dampen':>6} {'length':>10} {'total':>12} {'per level':>12}")
+
+    dampen: int
+    for dampen in DAMPENS:
+        length: int
+        for length in LENGTHS:
+            report: Report = generate_report(length, dampen)
+
+            assert is_report_safe_dampened(report, dampen=dampen)
+
+            seconds: float = min(
+                timeit.repeat(
+                    lambda: is_report_safe_dampened(report, dampen=dampen),
+                    number=1,
+                    repeat=REPEAT,
+                )
+            )
+
+            print(
+                f"{dampen:>6} {length:>10,} {seconds * 1000:>9.2f} ms"
+                f" {seconds / length * 1e9:>9.1f} ns"
+            )
+
+
+if __name__ == "__main__":
+    main()
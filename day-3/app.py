@@ -1,13 +1,31 @@
 """Day 3: Mull It Over"""
 
+import itertools
+import mmap
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Final, Generator, Iterable, Optional, Sequence
+from typing import (
+    BinaryIO,
+    Callable,
+    Final,
+    Generator,
+    Iterable,
+    Mapping,
+    MutableSequence,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeAlias,
+    Union,
+)
 
 
 class Operator(str, Enum):
-    """Known instruction operators"""
+    """Operators of the default instruction set"""
 
     def __str__(self) -> str:
         return self.value
@@ -17,30 +35,230 @@ class Operator(str, Enum):
     DONT: str = "don't"
 
 
-@dataclass
-class Instruction:
+class Instruction(NamedTuple):
     """Container for the component parts of an instruction (operator & operands)"""
 
-    operator: Operator
-    operands: Sequence[str] = field(default_factory=tuple)
+    operator: str
+    operands: Tuple[int, ...] = ()
+
+
+class Totals(NamedTuple):
+    """Sums of multiplications, both all of them and only those enabled"""
+
+    unconditional: int = 0
+    conditional: int = 0
+
+
+class Summary(NamedTuple):
+    """
+    Summary of a segment of instructions, composable with those of other segments
+
+    Both the conditional sum and the state the segment ends in depend only on
+    whether the segment starts enabled, so each is kept for either starting state.
+    """
+
+    unconditional: int = 0
+    if_enabled: int = 0
+    if_disabled: int = 0
+    end_if_enabled: bool = True
+    end_if_disabled: bool = False
+
+
+@dataclass
+class Machine:
+    """Mutable state of a machine executing instructions"""
+
+    enabled: bool = True
+    unconditional: int = 0
+    conditional: int = 0
+
+    @property
+    def totals(self) -> Totals:
+        """Sums of multiplications executed so far"""
+
+        return Totals(self.unconditional, self.conditional)
+
+
+Handler: TypeAlias = Callable[..., None]
 
 
-def _build_instruction_pattern(operator: Operator, *operands: str) -> str:
-    """Build a composite instruction pattern from operator & operand patterns"""
+class Opcode(NamedTuple):
+    """A registered instruction: its mnemonic, number of operands & handler"""
 
-    return rf"{operator}\({OPERAND_SEP.join(operands)}\)"
+    mnemonic: str
+    arity: int
+    handler: Handler
+
+
+class CompiledInstructionSet(NamedTuple):
+    """
+    Combined pattern (as both `str` & `bytes`) of an instruction set, with a
+    dispatch table of (opcode, start, stop) ranges of the group numbers holding the
+    operands, indexed by the `lastindex` of the match
+    """
+
+    regex: re.Pattern
+    regex_bytes: re.Pattern
+    dispatch: Sequence[Optional[Tuple[Opcode, int, int]]]
+    handlers: Mapping[str, Handler]
+    max_length: int
 
 
-OPERATOR: Final[str] = r"[a-z']+"
 OPERAND: Final[str] = r"\d{1,3}"
 OPERAND_SEP: Final[str] = ","
+MAX_OPERAND_LENGTH: Final[int] = 3
+
+# Characters which follow the mnemonic of an instruction
+ARGUMENT_CHARACTERS: Final[str] = "()" + OPERAND_SEP + "0123456789"
+
+DEFAULT_WINDOW_SIZE: Final[int] = 1 << 24
+SEGMENTS_PER_WORKER: Final[int] = 4
+
+
+def _can_start_inside(mnemonic: str, other: str, /) -> bool:
+    """Check whether an instruction `other` can start inside instruction `mnemonic`"""
+
+    # Within the mnemonic, `other` must end where it does (as an opening bracket
+    # follows both), and otherwise it must start with one of the arguments
+    return other[:1] in ARGUMENT_CHARACTERS or any(
+        other == mnemonic[index:] for index in range(1, len(mnemonic))
+    )
+
+
+@dataclass
+class InstructionSet:
+    """Registry of opcodes, compiled into a single pattern & dispatch table"""
+
+    opcodes: MutableSequence[Opcode] = field(default_factory=list)
+
+    _compiled: Optional[CompiledInstructionSet] = field(
+        default=None, init=False, repr=False
+    )
+
+    def register(
+        self, mnemonic: str, /, arity: int = 0
+    ) -> Callable[[Handler], Handler]:
+        """
+        Register a handler for an opcode, e.g. `@instruction_set.register("mul", 2)`
+
+        Handlers are called with the machine and then each (int) operand.
+        """
+
+        def decorator(handler: Handler, /) -> Handler:
+            self.opcodes.append(Opcode(str(mnemonic), arity, handler))
+            self._compiled = None
+
+            return handler
+
+        return decorator
+
+    def compile(self) -> CompiledInstructionSet:
+        """Compile (and cache) the combined pattern & dispatch table"""
+
+        if self._compiled is not None:
+            return self._compiled
+
+        assert self.opcodes, "Instruction set has no opcodes"
+
+        # Segments of a file are scanned independently (see `evaluate_parallel`),
+        # which is only sound if no instruction can start inside another
+        opcode: Opcode
+        other: Opcode
+        for opcode, other in itertools.product(self.opcodes, repeat=2):
+            if _can_start_inside(opcode.mnemonic, other.mnemonic):
+                raise ValueError(
+                    f"Opcode {other.mnemonic!r} can start inside {opcode.mnemonic!r}"
+                )
+
+        patterns: MutableSequence[str] = []
+        dispatch: MutableSequence[Optional[Tuple[Opcode, int, int]]] = [None]
+
+        for opcode in self.opcodes:
+            operands: str = OPERAND_SEP.join((f"({OPERAND})",) * opcode.arity)
+            patterns.append(rf"({re.escape(opcode.mnemonic)}\({operands}\))")
+
+            # The instruction's own group, followed by one group per operand
+            index: int = len(dispatch)
+            dispatch.append((opcode, index + 1, index + 1 + opcode.arity))
+            dispatch.extend((None,) * opcode.arity)
+
+        # Only attempt the alternation at characters which can start an opcode,
+        # which lets the regex engine skip ahead rather than try every branch
+        first_characters: str = "".join(
+            sorted({opcode.mnemonic[0] for opcode in self.opcodes})
+        )
+        pattern: str = rf"(?=[{re.escape(first_characters)}])(?:{'|'.join(patterns)})"
+
+        self._compiled = CompiledInstructionSet(
+            re.compile(pattern),
+            re.compile(pattern.encode()),
+            dispatch,
+            {opcode.mnemonic: opcode.handler for opcode in self.opcodes},
+            max(
+                len(opcode.mnemonic.encode())
+                + len("()")
+                + opcode.arity * MAX_OPERAND_LENGTH
+                + max(0, opcode.arity - 1) * len(OPERAND_SEP)
+                for opcode in self.opcodes
+            ),
+        )
+
+        return self._compiled
+
+    def execute(self, string: str, /, machine: Optional[Machine] = None) -> Machine:
+        """Execute all instructions found in a given string"""
+
+        if machine is None:
+            machine = Machine()
+
+        regex: re.Pattern
+        dispatch: Sequence[Optional[Tuple[Opcode, int, int]]]
+        regex, _, dispatch, _, _ = self.compile()
+
+        opcode: Opcode
+        start: int
+        stop: int
+
+        match: re.Match
+        for match in regex.finditer(string):
+            entry: Optional[Tuple[Opcode, int, int]] = dispatch[match.lastindex or 0]
+
+            assert entry is not None
+
+            opcode, start, stop = entry
+
+            opcode.handler(
+                machine, *map(int, map(match.__getitem__, range(start, stop)))
+            )
+
+        return machine
+
+
+INSTRUCTION_SET: Final[InstructionSet] = InstructionSet()
+
+
+@INSTRUCTION_SET.register(Operator.MUL, 2)
+def _mul(machine: Machine, lhs: int, rhs: int, /) -> None:
+    """Multiply two operands, adding the product to the sum(s)"""
+
+    machine.unconditional += lhs * rhs
+
+    if machine.enabled:
+        machine.conditional += lhs * rhs
+
 
-PATTERN_MUL: Final[str] = _build_instruction_pattern(Operator.MUL, OPERAND, OPERAND)
-PATTERN_DO: Final[str] = _build_instruction_pattern(Operator.DO)
-PATTERN_DONT: Final[str] = _build_instruction_pattern(Operator.DONT)
+@INSTRUCTION_SET.register(Operator.DO)
+def _do(machine: Machine, /) -> None:
+    """Enable future multiplications"""
 
-PATTERN_INSTRUCTION: Final[str] = rf"(?P<operator>{OPERATOR}+)\((?P<operands>.*)\)"
-PATTERN_INSTRUCTIONS: Final[str] = "|".join((PATTERN_MUL, PATTERN_DO, PATTERN_DONT))
+    machine.enabled = True
+
+
+@INSTRUCTION_SET.register(Operator.DONT)
+def _dont(machine: Machine, /) -> None:
+    """Disable future multiplications"""
+
+    machine.enabled = False
 
 
 def read_input() -> str:
@@ -51,27 +269,227 @@ def read_input() -> str:
         return file.read()
 
 
-def find_instructions(string: str, /) -> Generator[Instruction, None, None]:
-    """Find (and yield) all instructions in a given string"""
+def _to_instruction(
+    match: re.Match, dispatch: Sequence[Optional[Tuple[Opcode, int, int]]], /
+) -> Instruction:
+    """Convert an instruction match (of either `str` or `bytes`) to an instruction"""
+
+    entry: Optional[Tuple[Opcode, int, int]] = dispatch[match.lastindex or 0]
+
+    assert entry is not None
+
+    opcode: Opcode
+    start: int
+    stop: int
+    opcode, start, stop = entry
+
+    return Instruction(
+        opcode.mnemonic, tuple(map(int, map(match.__getitem__, range(start, stop))))
+    )
+
+
+def find_instructions(
+    string: str, /, *, instruction_set: InstructionSet = INSTRUCTION_SET
+) -> Generator[Instruction, None, None]:
+    """Lazily find (and yield) all instructions in a given string"""
+
+    compiled: CompiledInstructionSet = instruction_set.compile()
+
+    match: re.Match
+    for match in compiled.regex.finditer(string):
+        yield _to_instruction(match, compiled.dispatch)
+
+
+def scan_instructions(
+    buffer: Union[bytes, mmap.mmap],
+    /,
+    *,
+    start: int = 0,
+    end: Optional[int] = None,
+    window_size: int = DEFAULT_WINDOW_SIZE,
+    instruction_set: InstructionSet = INSTRUCTION_SET,
+) -> Generator[Instruction, None, None]:
+    """
+    Lazily find (and yield) all instructions starting in `buffer[start:end]`
+
+    The buffer is scanned a window at a time, without decoding (or copying) it.
+    Each window is extended by enough bytes to complete any instruction which
+    straddles its end, and scanning resumes from the end of the last instruction,
+    so every instruction is found exactly once.
+    """
+
+    assert window_size > 0, "Window size must be positive"
 
-    instructions: Sequence[str] = re.findall(PATTERN_INSTRUCTIONS, string)
+    compiled: CompiledInstructionSet = instruction_set.compile()
+    size: int = len(buffer)
 
-    instruction: str
+    if end is None or end > size:
+        end = size
+
+    position: int = start
+
+    while position < end:
+        window_end: int = min(position + window_size, end)
+        overlap_end: int = min(window_end + compiled.max_length - 1, size)
+
+        match: re.Match
+        for match in compiled.regex_bytes.finditer(buffer, position, overlap_end):
+            if match.start() >= window_end:
+                break
+
+            yield _to_instruction(match, compiled.dispatch)
+
+            window_end = max(window_end, match.end())
+
+        position = window_end
+
+
+def scan_file(
+    path: str = "input",
+    /,
+    *,
+    start: int = 0,
+    end: Optional[int] = None,
+    window_size: int = DEFAULT_WINDOW_SIZE,
+    instruction_set: InstructionSet = INSTRUCTION_SET,
+) -> Generator[Instruction, None, None]:
+    """Lazily find (and yield) all instructions starting in a (memory-mapped) file"""
+
+    file: BinaryIO
+    with open(path, "rb") as file:
+        # Empty files can't be memory-mapped (but contain no instructions anyway)
+        if not os.fstat(file.fileno()).st_size:
+            return
+
+        buffer: mmap.mmap
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield from scan_instructions(
+                buffer,
+                start=start,
+                end=end,
+                window_size=window_size,
+                instruction_set=instruction_set,
+            )
+
+
+def summarise(
+    instructions: Iterable[Instruction],
+    /,
+    *,
+    instruction_set: InstructionSet = INSTRUCTION_SET,
+) -> Summary:
+    """
+    Evaluate a segment of instructions, without knowing its initial state
+
+    The segment is executed by two machines at once, one starting enabled and the
+    other disabled, so any toggle (setting, keeping or inverting the state) is
+    summarised faithfully.
+    """
+
+    handlers: Mapping[str, Handler] = instruction_set.compile().handlers
+
+    machine_enabled: Machine = Machine(enabled=True)
+    machine_disabled: Machine = Machine(enabled=False)
+
+    instruction: Instruction
     for instruction in instructions:
-        instruction_match: Optional[re.Match] = re.match(
-            PATTERN_INSTRUCTION, instruction
+        handler: Handler = handlers[instruction.operator]
+
+        handler(machine_enabled, *instruction.operands)
+        handler(machine_disabled, *instruction.operands)
+
+    return Summary(
+        machine_enabled.unconditional,
+        machine_enabled.conditional,
+        machine_disabled.conditional,
+        machine_enabled.enabled,
+        machine_disabled.enabled,
+    )
+
+
+def combine(summaries: Iterable[Summary], /) -> Totals:
+    """Combine the summaries of consecutive segments, from left to right"""
+
+    do: bool = True
+    sum_of_multiplications: int = 0
+    sum_of_multiplications_conditional: int = 0
+
+    summary: Summary
+    for summary in summaries:
+        sum_of_multiplications += summary.unconditional
+        sum_of_multiplications_conditional += (
+            summary.if_enabled if do else summary.if_disabled
         )
 
-        assert instruction_match is not None
+        do = summary.end_if_enabled if do else summary.end_if_disabled
+
+    return Totals(sum_of_multiplications, sum_of_multiplications_conditional)
+
+
+def evaluate(
+    instructions: Iterable[Instruction],
+    /,
+    *,
+    instruction_set: InstructionSet = INSTRUCTION_SET,
+) -> Totals:
+    """Evaluate a stream of instructions, carrying the enabled state throughout"""
 
-        raw_operator: str
-        raw_operands: str
-        raw_operator, raw_operands = instruction_match.groups()
+    handlers: Mapping[str, Handler] = instruction_set.compile().handlers
+    machine: Machine = Machine()
 
-        operator: Operator = Operator(raw_operator)
-        operands: Sequence[str] = raw_operands.split(OPERAND_SEP)
+    instruction: Instruction
+    for instruction in instructions:
+        handlers[instruction.operator](machine, *instruction.operands)
 
-        yield Instruction(operator, operands)
+    return machine.totals
+
+
+def summarise_file_segment(
+    path: str, start: int, end: int, instruction_set: InstructionSet, /
+) -> Summary:
+    """Summarise the instructions starting in the byte range [start, end) of a file"""
+
+    return summarise(
+        scan_file(path, start=start, end=end, instruction_set=instruction_set),
+        instruction_set=instruction_set,
+    )
+
+
+def evaluate_parallel(
+    path: str = "input",
+    /,
+    *,
+    workers: Optional[int] = None,
+    instruction_set: InstructionSet = INSTRUCTION_SET,
+) -> Totals:
+    """
+    Evaluate the instructions of a file by summarising segments of it in parallel
+
+    A segment may start part way through an instruction that the previous segment
+    finishes, which is safe as no instruction can contain the start of another
+    (which `InstructionSet.compile` ensures).
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    size: int = os.path.getsize(path)
+    segments: int = workers * SEGMENTS_PER_WORKER
+    offsets: Sequence[int] = sorted(
+        {size * index // segments for index in range(segments + 1)}
+    )
+
+    executor: ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return combine(
+            executor.map(
+                summarise_file_segment,
+                itertools.repeat(path),
+                offsets[:-1],
+                offsets[1:],
+                itertools.repeat(instruction_set),
+            )
+        )
 
 
 def main() -> None:
@@ -80,35 +498,16 @@ def main() -> None:
     # Load the entire dataset into memory
     dataset: str = read_input()
 
+    totals: Totals = evaluate(find_instructions(dataset))
+
     # --- Part One ---
-    sum_of_multiplications: int = sum(
-        int(lhs) * int(rhs)
-        for lhs, rhs in re.findall(r"mul\((?P<lhs>\d{1,3}),(?P<rhs>\d{1,3})\)", dataset)
-    )
+    sum_of_multiplications: int = totals.unconditional
+
     print("Sum of Multiplications:", sum_of_multiplications)
     assert sum_of_multiplications == 175700056
 
     # --- Part Two ---
-
-    do: bool = True
-    sum_of_multiplications_conditional: int = 0
-
-    instruction: Instruction
-    for instruction in find_instructions(dataset):
-        match instruction.operator:
-            case Operator.DO:
-                do = True
-            case Operator.DONT:
-                do = False
-            case Operator.MUL:
-                if not do:
-                    continue
-
-                lhs: int
-                rhs: int
-                lhs, rhs = map(int, instruction.operands)
-
-                sum_of_multiplications_conditional += lhs * rhs
+    sum_of_multiplications_conditional: int = totals.conditional
 
     print("Sum of Multiplications (Conditional):", sum_of_multiplications_conditional)
     assert sum_of_multiplications_conditional == 71668682
@@ -0,0 +1,65 @@
+"""Day 3: Mull It Over (Benchmarks)"""
+
+import timeit
+from typing import Final, Sequence
+
+from app import INSTRUCTION_SET, InstructionSet, Machine, read_input
+
+# Constants
+REPEAT: Final[int] = 5
+SCALE: Final[int] = 50
+EXTRA_OPCODES: Final[Sequence[int]] = (0, 1, 2, 4, 8, 16, 32)
+
+
+def _add(machine: Machine, lhs: int, rhs: int, /) -> None:
+    machine.unconditional += lhs + rhs
+
+
+def build_instruction_set(extra_opcodes: int, /) -> InstructionSet:
+    """Build the default instruction set, extended with `extra_opcodes` opcodes"""
+
+    instruction_set: InstructionSet = InstructionSet([*INSTRUCTION_SET.opcodes])
+
+    index: int
+    for index in range(extra_opcodes):
+        instruction_set.register(f"op{index}", 2)(_add)
+
+    return instruction_set
+
+
+def main() -> None:
+    """Benchmarks for AoC 2024, Day 3"""
+
+    dataset: str = read_input() * SCALE
+    megabytes: float = len(dataset.encode()) / 1e6
+
+    print(f"{'opcodes':>7} {'throughput':>14} {'per opcode':>12}")
+
+    baseline: float = 0
+
+    extra_opcodes: int
+    for extra_opcodes in EXTRA_OPCODES:
+        instruction_set: InstructionSet = build_instruction_set(extra_opcodes)
+        instruction_set.compile()
+
+        seconds: float = min(
+            timeit.repeat(
+                lambda: instruction_set.execute(dataset), number=1, repeat=REPEAT
+            )
+        )
+        throughput: float = megabytes / seconds
+
+        if not extra_opcodes:
+            baseline = seconds
+
+        # Added cost (in seconds per MB) of each opcode beyond the default three
+        cost: float = (seconds - baseline) / max(1, extra_opcodes) / megabytes
+
+        print(
+            f"{len(instruction_set.opcodes):>7} {throughput:>9.2f} MB/s"
+            f" {cost * 1000:>9.2f} ms/MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,61 @@
 """Day 4: Ceres Search"""
 
 import re
-from typing import Any, Iterable, MutableSequence, Sequence, Tuple, TypeAlias, TypeVar
+from collections import deque
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    BinaryIO,
+    Deque,
+    Dict,
+    Final,
+    Generator,
+    Iterable,
+    Iterator,
+    MutableSequence,
+    NamedTuple,
+    Sequence,
+    Tuple,
+    TypeAlias,
+    TypeVar,
+)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, and only required by the `*_numpy` functions
+    np = None  # type: ignore[assignment]
 
 T = TypeVar("T")
 
 Coord: TypeAlias = Tuple[int, int]
 Grid: TypeAlias = Sequence[Sequence[T]]
+Template: TypeAlias = Sequence[str]
+
+
+class Counts(NamedTuple):
+    """Counts of a word (in all 8 directions) and of its crossed "X" pattern"""
+
+    words: int = 0
+    crosses: int = 0
+
+
+# Constants
+DIRECTIONS: Final[Sequence[Coord]] = (
+    (0, 1),
+    (1, 1),
+    (1, 0),
+    (1, -1),
+    (0, -1),
+    (-1, -1),
+    (-1, 0),
+    (-1, 1),
+)
+WILDCARD: Final[str] = "."
+X_MAS: Final[Template] = (
+    "M.S",
+    ".A.",
+    "M.S",
+)
 
 
 def get_grid_size(grid: Grid[Any], /) -> Tuple[int, int]:
@@ -19,16 +68,6 @@ def get_grid_size(grid: Grid[Any], /) -> Tuple[int, int]:
     return (size_x, size_y)
 
 
-def get_square_grid_size(grid: Grid[Any], /) -> int:
-    size_x: int
-    size_y: int
-    size_x, size_y = get_grid_size(grid)
-
-    assert size_x == size_y, f"Grid is not a square ({size_x}x{size_y})"
-
-    return size_x
-
-
 def read_input() -> str:
     """Read the input file"""
 
@@ -40,48 +79,31 @@ def read_input() -> str:
 def to_diagonal(
     strings: Sequence[str], /, *, anchor: Tuple[int, int] = (0, 0)
 ) -> Sequence[str]:
-    """Produce a sequence of diagonal strings from a given sequence (assuming a perfect square)"""
+    """
+    Produce a sequence of diagonal strings from a given sequence, fanning out from
+    the `anchor` (row, column) corner of the grid (which need not be square)
+    """
 
     if not strings:
         return ()
 
-    size: int = len(strings[0])
+    size_x: int
+    size_y: int
+    size_x, size_y = get_grid_size(strings)
+
+    anchor_x: int
+    anchor_y: int
+    anchor_x, anchor_y = anchor
 
     strings_diagonal: MutableSequence[str] = []
 
     depth: int
-    string_diagonal: str
-    x: int
-    y: int
-    true_x: int
-    true_y: int
-
-    for depth in range(size):
-        string_diagonal = ""
-
-        for y in range(depth + 1):
-            x = depth - y
-
-            true_x = abs(anchor[0] - x)
-            true_y = abs(anchor[1] - y)
-
-            string_diagonal += strings[true_x][true_y]
-
-        strings_diagonal.append(string_diagonal)
-
-    for depth in range(size - 1):
-        true_depth = size - depth - 2
-
-        string_diagonal = ""
-
-        for a in range(size - depth - 1):
-            y = depth + a + 1
-            x = (true_depth - a) + depth + 1
-
-            true_x = abs(anchor[0] - x)
-            true_y = abs(anchor[1] - y)
-
-            string_diagonal += strings[true_x][true_y]
+    for depth in range(size_x + size_y - 1):
+        # Walk along the line of cells (x, y) where x + y == depth
+        string_diagonal: str = "".join(
+            strings[abs(anchor_x - (depth - y))][abs(anchor_y - y)]
+            for y in range(max(0, depth - size_y + 1), min(size_x, depth + 1))
+        )
 
         strings_diagonal.append(string_diagonal)
 
@@ -92,44 +114,45 @@ def count_xmas_in_strings(strings: Sequence[str], /) -> int:
     return sum(len(re.findall("XMAS", string)) for string in strings)
 
 
-# Load the entire dataset into memory
-dataset: str = read_input()
+def count_xmas(lines_horizontal: Sequence[str], /) -> int:
+    """Count the occurrences of "XMAS" in a grid, in all 8 directions (part one)"""
 
-# --- Part One ---
+    if not lines_horizontal:
+        return 0
 
-lines_horizontal: Sequence[str] = dataset.splitlines()
-lines_vertical: Sequence[str] = tuple("".join(line) for line in zip(*lines_horizontal))
-
-size: int = len(lines_horizontal[0])
+    lines_vertical: Sequence[str] = tuple(
+        "".join(line) for line in zip(*lines_horizontal)
+    )
 
-lines_diagonal_left: Sequence[str] = to_diagonal(lines_horizontal, anchor=(0, 0))
-lines_diagonal_right: Sequence[str] = to_diagonal(
-    lines_horizontal, anchor=(0, size - 1)
-)
+    size_x: int = len(lines_horizontal[0])
 
-seq_of_lines: Sequence[Sequence[str]] = (
-    lines_horizontal,
-    lines_vertical,
-    lines_diagonal_left,
-    lines_diagonal_right,
-)
+    lines_diagonal_left: Sequence[str] = to_diagonal(lines_horizontal, anchor=(0, 0))
+    lines_diagonal_right: Sequence[str] = to_diagonal(
+        lines_horizontal, anchor=(0, size_x - 1)
+    )
 
-total_xmas_occurences: int = 0
+    seq_of_lines: Sequence[Sequence[str]] = (
+        lines_horizontal,
+        lines_vertical,
+        lines_diagonal_left,
+        lines_diagonal_right,
+    )
 
-lines: Sequence[str]
-for lines in seq_of_lines:
-    lines_inv: Sequence[str] = tuple(line[::-1] for line in lines)
+    total_xmas_occurences: int = 0
 
-    total_xmas_occurences += count_xmas_in_strings(lines)
-    total_xmas_occurences += count_xmas_in_strings(lines_inv)
+    lines: Sequence[str]
+    for lines in seq_of_lines:
+        lines_inv: Sequence[str] = tuple(line[::-1] for line in lines)
 
-print("Part 1:", total_xmas_occurences)
-assert total_xmas_occurences == 2468
+        total_xmas_occurences += count_xmas_in_strings(lines)
+        total_xmas_occurences += count_xmas_in_strings(lines_inv)
 
-# --- Part Two ---
+    return total_xmas_occurences
 
 
 def find_all_a_coords(letters: Sequence[Sequence[str]], /) -> Sequence[Tuple[int, int]]:
+    """Find the (row, column) coordinates of every "A" in a grid"""
+
     if not letters:
         return ()
 
@@ -139,9 +162,9 @@ def find_all_a_coords(letters: Sequence[Sequence[str]], /) -> Sequence[Tuple[int
     coords: MutableSequence[Tuple[int, int]] = []
 
     x: int
-    for x in range(size_x):
+    for x in range(size_y):
         y: int
-        for y in range(size_y):
+        for y in range(size_x):
             letter: str = letters[x][y]
 
             if letter == "A":
@@ -153,16 +176,19 @@ def find_all_a_coords(letters: Sequence[Sequence[str]], /) -> Sequence[Tuple[int
 def get_cross_words_for_coord(
     letters: Sequence[Sequence[str]], coord: Tuple[int, int], /
 ) -> Sequence[str]:
-    size: int = len(letters[0])
-    bounds: Tuple[int, int] = (0, size - 1)
+    """Get the two diagonal words which cross at a given (row, column) coordinate"""
+
+    size_x: int
+    size_y: int
+    size_x, size_y = get_grid_size(letters)
 
     x: int
     y: int
     x, y = coord
 
-    if x in bounds or y in bounds:
+    if x in (0, size_y - 1) or y in (0, size_x - 1):
         # Don't bother doing anything, as there can be at most two
-        # letters per diag as we're at a corner.
+        # letters per diag as we're at an edge.
         return ()
 
     tl_to_br: str = "".join(
@@ -183,26 +209,415 @@ def get_cross_words_for_coord(
     return (tl_to_br, tr_to_bl)
 
 
-coords: Sequence[Tuple[int, int]] = find_all_a_coords(lines_horizontal)
+def count_x_mas(lines_horizontal: Sequence[str], /) -> int:
+    """Count the occurrences of two "MAS" crossing in an X in a grid (part two)"""
+
+    coords: Sequence[Tuple[int, int]] = find_all_a_coords(lines_horizontal)
+
+    total_count_of_x_mas: int = 0
+
+    coord: Tuple[int, int]
+    for coord in coords:
+        cross_words: Sequence[str] = get_cross_words_for_coord(lines_horizontal, coord)
+
+        if not cross_words:
+            continue
+
+        cross_words_inv: Sequence[str] = tuple(
+            cross_word[::-1] for cross_word in cross_words
+        )
+
+        all_cross_words: Sequence[str] = (*cross_words, *cross_words_inv)
+        count_of_x_mas: int = sum(map(lambda line: line == "MAS", all_cross_words))
+
+        if count_of_x_mas == 2:
+            total_count_of_x_mas += 1
+
+    return total_count_of_x_mas
+
+
+def read_grid_numpy(path: str = "input", /) -> "np.ndarray":
+    """Read the input file into a (rows x columns) uint8 array of characters"""
+
+    assert np is not None, "NumPy is required for the NumPy-backed mode"
+
+    file: BinaryIO
+    with open(path, "rb") as file:
+        rows: Sequence[bytes] = file.read().splitlines()
+
+    width: int = len(rows[0]) if rows else 0
+
+    assert all(len(row) == width for row in rows), "Grid rows differ in length"
+
+    return np.frombuffer(b"".join(rows), dtype=np.uint8).reshape(len(rows), width)
+
+
+def count_word_numpy(grid: "np.ndarray", word: str, /) -> int:
+    """
+    Count the occurrences of a word in a grid, in all 8 directions
+
+    For each direction, every letter of the word is compared against a view of the
+    grid shifted by that letter's offset, and the comparisons are AND-ed together,
+    leaving a mask of the positions at which the word starts.
+    """
+
+    if not word:
+        return 0
+
+    height: int
+    width: int
+    height, width = grid.shape
+
+    letters: np.ndarray = np.frombuffer(word.encode(), dtype=np.uint8)
+    span: int = len(letters) - 1
+
+    total: int = 0
+
+    dy: int
+    dx: int
+    for dy, dx in DIRECTIONS:
+        # Range of starting positions from which the word stays within the grid
+        y_start: int = max(0, -dy * span)
+        y_stop: int = height - max(0, dy * span)
+        x_start: int = max(0, -dx * span)
+        x_stop: int = width - max(0, dx * span)
+
+        if y_start >= y_stop or x_start >= x_stop:
+            continue
+
+        matches: np.ndarray = np.ones((y_stop - y_start, x_stop - x_start), dtype=bool)
+
+        index: int
+        letter: np.uint8
+        for index, letter in enumerate(letters):
+            matches &= (
+                grid[
+                    y_start + dy * index : y_stop + dy * index,
+                    x_start + dx * index : x_stop + dx * index,
+                ]
+                == letter
+            )
+
+        total += int(np.count_nonzero(matches))
+
+    return total
+
+
+def get_template_variants(template: Template, /) -> Sequence[Template]:
+    """Get the distinct rotations & reflections of a template"""
+
+    variants: Dict[Template, None] = {}
+
+    variant: Template = tuple(template)
+
+    reflection: int
+    for reflection in range(2):
+        rotation: int
+        for rotation in range(4):
+            variants.setdefault(variant)
+
+            # Rotate by a quarter turn (clockwise)
+            variant = tuple("".join(column) for column in zip(*variant[::-1]))
+
+        # Reflect (left to right)
+        variant = tuple(row[::-1] for row in variant)
+
+    return tuple(variants)
+
+
+def count_template_numpy(grid: "np.ndarray", template: Template, /) -> int:
+    """
+    Count the placements of a template in a grid (`WILDCARD` matches any letter)
+
+    Every non-wildcard cell of the template is compared against a view of the grid
+    shifted by that cell's offset, and the comparisons are AND-ed together, leaving
+    a mask of the positions at which the template's top-left corner can be placed.
+    """
+
+    size_x: int
+    size_y: int
+    size_x, size_y = get_grid_size(template)
+
+    height: int
+    width: int
+    height, width = grid.shape
+
+    if not size_x or size_y > height or size_x > width:
+        return 0
+
+    matches: np.ndarray = np.ones((height - size_y + 1, width - size_x + 1), dtype=bool)
+
+    y: int
+    row: str
+    for y, row in enumerate(template):
+        x: int
+        letter: str
+        for x, letter in enumerate(row):
+            if letter == WILDCARD:
+                continue
+
+            matches &= grid[y : y + matches.shape[0], x : x + matches.shape[1]] == ord(
+                letter
+            )
+
+    return int(np.count_nonzero(matches))
+
+
+def count_template_variants_numpy(grid: "np.ndarray", template: Template, /) -> int:
+    """Count the placements of a template (in any orientation) in a grid"""
+
+    return sum(
+        count_template_numpy(grid, variant)
+        for variant in get_template_variants(template)
+    )
+
+
+def iter_grid_lines(rows: Sequence[str], /) -> Generator[str, None, None]:
+    """
+    Lazily yield every line of a (possibly non-square) grid, in 4 directions:
+    horizontal, vertical, diagonal (down & right) and anti-diagonal (down & left)
+    """
+
+    if not rows:
+        return
+
+    height: int = len(rows)
+    width: int = len(rows[0])
+
+    yield from rows
+
+    x: int
+    for x in range(width):
+        yield "".join(row[x] for row in rows)
+
+    y: int
+    offset: int
+    for offset in range(1 - height, width):
+        yield "".join(
+            rows[y][y + offset]
+            for y in range(max(0, -offset), min(height, width - offset))
+        )
+
+    for offset in range(height + width - 1):
+        yield "".join(
+            rows[y][offset - y]
+            for y in range(max(0, offset - width + 1), min(height, offset + 1))
+        )
+
+
+@dataclass
+class Automaton:
+    """
+    Aho-Corasick automaton, for counting the occurrences of many words at once
+
+    Each word is added both forwards and backwards, so that streaming each line of
+    a grid through the automaton once (in either direction) counts the words in
+    both directions along that line.
+    """
+
+    words: Sequence[str]
+
+    _transitions: MutableSequence[Dict[str, int]] = field(
+        default_factory=list, init=False, repr=False
+    )
+    _failures: MutableSequence[int] = field(
+        default_factory=list, init=False, repr=False
+    )
+    _outputs: Sequence[Sequence[int]] = field(
+        default_factory=list, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        outputs: MutableSequence[MutableSequence[int]] = [[]]
+        self._transitions.append({})
+
+        # Build a trie of all words (and their reverses)
+        index: int
+        word: str
+        for index, word in enumerate(self.words):
+            pattern: str
+            for pattern in (word, word[::-1]):
+                if not pattern:
+                    continue
+
+                state: int = 0
+
+                letter: str
+                for letter in pattern:
+                    if letter not in self._transitions[state]:
+                        self._transitions[state][letter] = len(self._transitions)
+                        self._transitions.append({})
+                        outputs.append([])
+
+                    state = self._transitions[state][letter]
+
+                outputs[state].append(index)
+
+        # Link each state to the state of its longest proper suffix (breadth-first),
+        # inheriting that state's outputs along the way.
+        self._failures = [0] * len(self._transitions)
+        queue: Deque[int] = deque(self._transitions[0].values())
+
+        while queue:
+            parent: int = queue.popleft()
+
+            child: int
+            for letter, child in self._transitions[parent].items():
+                queue.append(child)
+
+                failure: int = self._failures[parent]
+                while failure and letter not in self._transitions[failure]:
+                    failure = self._failures[failure]
 
-total_count_of_x_mas: int = 0
+                self._failures[child] = self._transitions[failure].get(letter, 0)
+                outputs[child].extend(outputs[self._failures[child]])
 
-coord: Tuple[int, int]
-for coord in coords:
-    cross_words: Sequence[str] = get_cross_words_for_coord(lines_horizontal, coord)
+        self._outputs = outputs
 
-    if not cross_words:
-        continue
+    def count(self, lines: Iterable[str], /) -> Dict[str, int]:
+        """Count the occurrences of each word (in either direction) in the lines"""
 
-    cross_words_inv: Sequence[str] = tuple(
-        cross_word[::-1] for cross_word in cross_words
+        counts: MutableSequence[int] = [0] * len(self.words)
+
+        transitions: Sequence[Dict[str, int]] = self._transitions
+        failures: Sequence[int] = self._failures
+        outputs: Sequence[Sequence[int]] = self._outputs
+
+        line: str
+        for line in lines:
+            state: int = 0
+
+            letter: str
+            for letter in line:
+                while state and letter not in transitions[state]:
+                    state = failures[state]
+
+                state = transitions[state].get(letter, 0)
+
+                index: int
+                for index in outputs[state]:
+                    counts[index] += 1
+
+        return dict(zip(self.words, counts))
+
+
+def count_words(rows: Sequence[str], words: Sequence[str], /) -> Dict[str, int]:
+    """Count the occurrences of each word in a grid, in all 8 directions"""
+
+    return Automaton(words).count(iter_grid_lines(rows))
+
+
+def read_rows(path: str = "input", /) -> Generator[str, None, None]:
+    """Lazily read the rows of the input file"""
+
+    file: Iterable[str]
+    with open(path, encoding="utf-8") as file:
+        line: str
+        for line in file:
+            yield line.rstrip("\n")
+
+
+def _count_overlapping(string: str, word: str, /) -> int:
+    """Count the (possibly overlapping) occurrences of a word in a string"""
+
+    count: int = 0
+    index: int = string.find(word)
+
+    while index != -1:
+        count += 1
+        index = string.find(word, index + 1)
+
+    return count
+
+
+def _iter_down_right(rows: Sequence[str], /) -> Iterator[Tuple[str, ...]]:
+    """Yield the letters on each down-right diagonal spanning all given rows"""
+
+    return zip(*(row[offset:] for offset, row in enumerate(rows)))
+
+
+def _iter_down_left(rows: Sequence[str], /) -> Iterator[Tuple[str, ...]]:
+    """Yield the letters on each down-left diagonal spanning all given rows"""
+
+    return zip(*(row[len(rows) - offset - 1 :] for offset, row in enumerate(rows)))
+
+
+def count_streaming(
+    rows: Iterable[str], /, *, word: str = "XMAS", cross_word: str = "MAS"
+) -> Counts:
+    """
+    Count the occurrences of `word` (part one) and `cross_word` crossing in an "X"
+    (part two), while reading the rows of a grid in order
+
+    Only a sliding window of the most recent rows is kept, so memory is bounded by
+    the width of the grid and the length of the words, rather than by its height.
+    Each occurrence is counted once the row containing its last letter arrives.
+    """
+
+    assert word and cross_word, "Words must not be empty"
+
+    # Occurrences which read backwards are found by searching for the reverse word
+    word_letters: Sequence[Tuple[str, ...]] = (tuple(word), tuple(word[::-1]))
+    cross_letters: Sequence[Tuple[str, ...]] = (
+        tuple(cross_word),
+        tuple(cross_word[::-1]),
     )
 
-    all_cross_words: Sequence[str] = (*cross_words, *cross_words_inv)
-    count_of_x_mas: int = sum(map(lambda line: line == "MAS", all_cross_words))
+    window: Deque[str] = deque(maxlen=max(len(word), len(cross_word)))
+
+    words: int = 0
+    crosses: int = 0
+
+    row: str
+    for row in rows:
+        window.append(row)
+
+        # Horizontal (in both directions)
+        words += _count_overlapping(row, word) + _count_overlapping(row, word[::-1])
+
+        # Vertical & diagonal (in both directions), ending in this row
+        if len(window) >= len(word):
+            word_rows: Sequence[str] = tuple(window)[-len(word) :]
+
+            letters: Tuple[str, ...]
+            for letters in (
+                *zip(*word_rows),
+                *_iter_down_right(word_rows),
+                *_iter_down_left(word_rows),
+            ):
+                words += (letters == word_letters[0]) + (letters == word_letters[1])
+
+        # Crosses, whose bottom row is this row
+        if len(window) >= len(cross_word):
+            cross_rows: Sequence[str] = tuple(window)[-len(cross_word) :]
+
+            down_right: Tuple[str, ...]
+            down_left: Tuple[str, ...]
+            for down_right, down_left in zip(
+                _iter_down_right(cross_rows), _iter_down_left(cross_rows)
+            ):
+                crosses += down_right in cross_letters and down_left in cross_letters
+
+    return Counts(words, crosses)
+
+
+def main() -> None:
+    """Solution for AoC 2024, Day 4, Parts 1 & 2"""
+
+    # Load the entire dataset into memory
+    dataset: str = read_input()
+    lines_horizontal: Sequence[str] = dataset.splitlines()
+
+    # --- Part One ---
+    total_xmas_occurences: int = count_xmas(lines_horizontal)
+    print("Part 1:", total_xmas_occurences)
+    assert total_xmas_occurences == 2468
+
+    # --- Part Two ---
+    total_count_of_x_mas: int = count_x_mas(lines_horizontal)
+    print("Part 2:", total_count_of_x_mas)
+    assert total_count_of_x_mas == 1864
 
-    if count_of_x_mas == 2:
-        total_count_of_x_mas += 1
 
-print("Part 2:", total_count_of_x_mas)
-assert total_count_of_x_mas == 1864
+if __name__ == "__main__":
+    main()
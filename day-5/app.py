@@ -1,19 +1,47 @@
 """Day 5: Print Queue"""
 
+import heapq
+import itertools
+import mmap
+import os
+import struct
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from typing import (
+    BinaryIO,
+    Callable,
     Collection,
     Final,
+    Generator,
+    Generic,
+    Hashable,
     Iterable,
+    Iterator,
+    List,
+    Mapping,
     MutableMapping,
     MutableSequence,
     NamedTuple,
+    Optional,
     Sequence,
     Set,
+    Tuple,
     TypeAlias,
+    TypeVar,
+    Union,
 )
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, and only required by the `*_numpy` functions
+    np = None  # type: ignore[assignment]
+
 # Typing
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
 Update: TypeAlias = Sequence[int]
 MutableUpdate: TypeAlias = MutableSequence[int]
 
@@ -22,6 +50,16 @@ MutableUpdate: TypeAlias = MutableSequence[int]
 RULE_SEP: Final[str] = "|"
 UPDATE_SEP: Final[str] = ","
 SECTION_SEP: Final[str] = "\n\n"
+DEFAULT_CACHE_SIZE: Final[int] = 4096
+
+# Rule index layout: a fixed-size header (magic, version, row size in bytes, number
+# of rows & CRC-32 of the rows), followed by one little-endian bitmask row per page
+INDEX_MAGIC: Final[bytes] = b"AOC5"
+INDEX_VERSION: Final[int] = 1
+INDEX_HEADER: Final[struct.Struct] = struct.Struct("<4sHHII")
+
+# Number of updates validated at once (bounding the size of intermediate arrays)
+DEFAULT_BATCH_SIZE: Final[int] = 1024
 
 
 # Models
@@ -53,6 +91,21 @@ class RuleValidationError(Exception):
     rule: Rule
 
 
+@dataclass
+class RuleCycleError(Exception):
+    """Exception thrown when a rule or update can't be applied due to a cycle"""
+
+    pages: Sequence[int]
+
+
+@dataclass
+class RuleIndexError(Exception):
+    """Exception thrown when a rule index can't be loaded (e.g. it's corrupt)"""
+
+    path: str
+    reason: str
+
+
 def read_input() -> str:
     """Read the input file"""
 
@@ -100,17 +153,93 @@ def get_middle_page_number(update: Update, /) -> int:
     return update[length // 2]
 
 
+def get_page_positions(update: Update, /) -> Mapping[int, int]:
+    """Map each page number in an update to its (first) position in the update"""
+
+    page_positions: MutableMapping[int, int] = {}
+
+    page_index: int
+    page_number: int
+    for page_index, page_number in enumerate(update):
+        page_positions.setdefault(page_number, page_index)
+
+    return page_positions
+
+
 @dataclass
-class RuleMachine:
-    """Rule machine capable of learning rules and validating updates against learnt rules."""
+class LRUCache(Generic[K, V]):
+    """Bounded cache, evicting the least recently used entry once full"""
 
-    rules: MutableMapping[int, Set[int]] = field(default_factory=dict)
+    maxsize: int = DEFAULT_CACHE_SIZE
+
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+
+    _entries: "OrderedDict[K, V]" = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(self, key: K, compute: Callable[[], V], /) -> V:
+        """Get the cached value for `key`, computing (and caching) it if missing"""
+
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+
+            return self._entries[key]
+
+        self.misses += 1
+        value: V = compute()
+
+        if self.maxsize > 0:
+            self._entries[key] = value
+
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        return value
+
+    def clear(self) -> None:
+        """Evict all entries (the hit & miss counters are kept)"""
 
+        self._entries.clear()
+
+
+@dataclass
+class BaseRuleMachine(ABC):
+    """
+    Rule machine capable of learning rules and validating updates against learnt rules
+
+    Subclasses decide how the learnt rules are stored (and so how they're learnt &
+    checked), while updates are filtered, fixed & cached here.
+    """
+
+    cache_size: int = field(default=DEFAULT_CACHE_SIZE, kw_only=True)
+
+    validity_cache: LRUCache[Tuple[int, ...], bool] = field(
+        init=False, repr=False, compare=False
+    )
+    fix_cache: LRUCache[Tuple[int, ...], Update] = field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        self.validity_cache = LRUCache(self.cache_size)
+        self.fix_cache = LRUCache(self.cache_size)
+
+    def clear_caches(self) -> None:
+        """Clear all cached results (as they may no longer hold)"""
+
+        self.validity_cache.clear()
+        self.fix_cache.clear()
+
+    @abstractmethod
     def learn(self, rule: Rule, /) -> None:
         """Learn a given rule (affects all future update validations)"""
 
-        self.rules.setdefault(rule.x, set()).add(rule.y)
-
     def learn_all(self, rules: Iterable[Rule], /) -> None:
         """Learn all given rules (affects all future update validations)"""
 
@@ -118,9 +247,148 @@ class RuleMachine:
         for rule in rules:
             self.learn(rule)
 
+    @abstractmethod
+    def get_later_pages(self, page_number: int, /) -> Iterable[int]:
+        """Get the pages that *must* come after the given page (if present)"""
+
+    @abstractmethod
+    def get_bit_matrix(self) -> Sequence[int]:
+        """Get the learnt rules as rows of bitmasks of the pages after each page"""
+
+    @abstractmethod
+    def validate(self, update: Update, /) -> None:
+        """Validate an update against all learnt rules"""
+
+    def is_valid(self, update: Update, /) -> bool:
+        """Check whether the provided update is valid (caching the result)"""
+
+        return self.validity_cache.get_or_compute(
+            tuple(update), lambda: self._is_valid(update)
+        )
+
+    def _is_valid(self, update: Update, /) -> bool:
+        try:
+            self.validate(update)
+        except RuleValidationError:
+            return False
+
+        return True
+
+    def get_valid_updates(self, updates: Iterable[Update], /) -> Iterable[Update]:
+        """Filter `updates` into an iterable of only *valid* updates"""
+
+        return (update for update in updates if self.is_valid(update))
+
+    def get_invalid_updates(self, updates: Iterable[Update], /) -> Iterable[Update]:
+        """Filter `updates` into an iterable of only *invalid* updates"""
+
+        return (update for update in updates if not self.is_valid(update))
+
+    def fix(self, update: Update, /) -> Update:
+        """Fix the given update to make it valid, if applicable (caching the result)"""
+
+        return self.fix_cache.get_or_compute(tuple(update), lambda: self._fix(update))
+
+    def _fix(self, update: Update, /) -> Update:
+        """
+        Fix the given update to make it valid (if applicable)
+
+        The pages are topologically sorted (using Kahn's algorithm) over the rules
+        between them, always taking the earliest page (in the original update) that
+        is free to go next, so that valid orderings are left untouched.
+        """
+
+        # Group the positions of each page (in case a page appears more than once)
+        page_positions: MutableMapping[int, MutableSequence[int]] = {}
+
+        page_index: int
+        page_number: int
+        for page_index, page_number in enumerate(update):
+            page_positions.setdefault(page_number, []).append(page_index)
+
+        # Build the graph of rules between the pages of this update
+        later_indices: MutableSequence[MutableSequence[int]] = [[] for _ in update]
+        earlier_counts: MutableSequence[int] = [0] * len(update)
+
+        for page_index, page_number in enumerate(update):
+            later_page: int
+            for later_page in self.get_later_pages(page_number):
+                later_page_index: int
+                for later_page_index in page_positions.get(later_page, ()):
+                    later_indices[page_index].append(later_page_index)
+                    earlier_counts[later_page_index] += 1
+
+        # Repeatedly take the earliest page with no outstanding earlier pages
+        ready: List[int] = [
+            page_index
+            for page_index, earlier_count in enumerate(earlier_counts)
+            if not earlier_count
+        ]
+        new_update: MutableUpdate = []
+
+        while ready:
+            page_index = heapq.heappop(ready)
+            new_update.append(update[page_index])
+
+            for later_page_index in later_indices[page_index]:
+                earlier_counts[later_page_index] -= 1
+
+                if not earlier_counts[later_page_index]:
+                    heapq.heappush(ready, later_page_index)
+
+        # Any pages left over are part of (or ordered after) a cycle of rules,
+        # so there is no valid ordering.
+        if len(new_update) < len(update):
+            raise RuleCycleError(
+                tuple(
+                    page_number
+                    for page_number, earlier_count in zip(update, earlier_counts)
+                    if earlier_count
+                )
+            )
+
+        return tuple(new_update)
+
+
+@dataclass
+class RuleMachine(BaseRuleMachine):
+    """Rule machine storing learnt rules as a mapping of pages to their later pages"""
+
+    rules: MutableMapping[int, Set[int]] = field(default_factory=dict)
+
+    def learn(self, rule: Rule, /) -> None:
+        """Learn a given rule (affects all future update validations)"""
+
+        self.clear_caches()
+
+        self.rules.setdefault(rule.x, set()).add(rule.y)
+
+    def get_later_pages(self, page_number: int, /) -> Iterable[int]:
+        """Get the pages that *must* come after the given page (if present)"""
+
+        return self.rules.get(page_number, ())
+
+    def get_bit_matrix(self) -> Sequence[int]:
+        """Get the learnt rules as rows of bitmasks of the pages after each page"""
+
+        rows: MutableSequence[int] = [0] * (max(self.rules, default=-1) + 1)
+
+        page_number: int
+        later_pages: Set[int]
+        for page_number, later_pages in self.rules.items():
+            later_page: int
+            for later_page in later_pages:
+                rows[page_number] |= 1 << later_page
+
+        return rows
+
     def validate(self, update: Update, /) -> None:
         """Validate an update against all learnt rules"""
 
+        # Index the position of each page up-front, so that each rule can be
+        # checked in constant time (rather than searching the update for it)
+        page_positions: Mapping[int, int] = get_page_positions(update)
+
         page_index: int
         page_number: int
         for page_index, page_number in enumerate(update):
@@ -134,69 +402,422 @@ class RuleMachine:
 
             later_page: int
             for later_page in later_pages:
+                later_page_index: Optional[int] = page_positions.get(later_page)
+
                 # This "later" page doesn't appear in the update, so this
                 # specific rule doesn't apply.
-                if later_page not in update:
+                if later_page_index is None:
                     continue
 
-                later_page_index: int = update.index(later_page)
-
                 # If this "later" page appears before the current page,
                 # the rule has been broken and the update isn't valid.
                 if later_page_index < page_index:
                     raise RuleValidationError(Rule(page_number, later_page))
 
-    def is_valid(self, update: Update, /) -> bool:
-        """Check whether the provided update is valid"""
 
-        try:
-            self.validate(update)
-        except RuleValidationError:
-            return False
+def iter_bits(mask: int, /) -> Generator[int, None, None]:
+    """Lazily yield the index of each set bit in a bitmask (lowest first)"""
 
-        return True
+    while mask:
+        lowest_bit: int = mask & -mask
 
-    def get_valid_updates(self, updates: Iterable[Update], /) -> Iterable[Update]:
-        """Filter `updates` into an iterable of only *valid* updates"""
+        yield lowest_bit.bit_length() - 1
 
-        return (update for update in updates if self.is_valid(update))
+        mask ^= lowest_bit
 
-    def get_invalid_updates(self, updates: Iterable[Update], /) -> Iterable[Update]:
-        """Filter `updates` into an iterable of only *invalid* updates"""
 
-        return (update for update in updates if not self.is_valid(update))
+@dataclass
+class BitsetRuleMachine(BaseRuleMachine):
+    """
+    Rule machine storing learnt rules as an adjacency bit-matrix
 
-    def fix(self, update: Update, /) -> Update:
-        """Recursively fix the given update to make it valid (if applicable)"""
+    Row `x` is a bitmask of the pages that must come after page `x`, so page
+    numbers must be (small) non-negative integers.
+    """
 
-        rule: Rule
+    rows: MutableSequence[int] = field(default_factory=list)
 
-        # Validate the update, and if it's invalid, store a reference to
-        # the specific rule that causes the update to fail validation.
-        try:
-            self.validate(update)
+    def learn(self, rule: Rule, /) -> None:
+        """Learn a given rule (affects all future update validations)"""
+
+        self.clear_caches()
+
+        if rule.x >= len(self.rows):
+            self.rows.extend((0,) * (rule.x + 1 - len(self.rows)))
+
+        self.rows[rule.x] |= 1 << rule.y
+
+    def get_row(self, page_number: int, /) -> int:
+        """Get the bitmask of the pages that *must* come after the given page"""
+
+        if page_number >= len(self.rows):
+            return 0
+
+        return self.rows[page_number]
+
+    def get_later_pages(self, page_number: int, /) -> Iterable[int]:
+        """Get the pages that *must* come after the given page (if present)"""
+
+        return iter_bits(self.get_row(page_number))
+
+    def get_bit_matrix(self) -> Sequence[int]:
+        """Get the learnt rules as rows of bitmasks of the pages after each page"""
+
+        return self.rows
+
+    def validate(self, update: Update, /) -> None:
+        """Validate an update against all learnt rules"""
+
+        # Bitmask of the pages seen so far
+        earlier_pages: int = 0
+
+        page_number: int
+        for page_number in update:
+            # Any "later" pages which have already been seen break a rule
+            broken_pages: int = self.get_row(page_number) & earlier_pages
+
+            if broken_pages:
+                raise RuleValidationError(
+                    Rule(page_number, next(iter_bits(broken_pages)))
+                )
+
+            earlier_pages |= 1 << page_number
+
+
+@dataclass
+class ClosureRuleMachine(BitsetRuleMachine):
+    """
+    Bitset rule machine which also derives the transitive closure of its rules
+
+    Rules only apply between pages of the same update (the puzzle's rules are cyclic
+    as a whole), so the closure is taken over the rules between a given set of pages
+    (e.g. those of an update), and cached per set of pages until a rule is learnt.
+    """
+
+    closure_cache: LRUCache[int, Mapping[int, int]] = field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+
+        self.closure_cache = LRUCache(self.cache_size)
+
+    def clear_caches(self) -> None:
+        """Clear all cached results (as they may no longer hold)"""
+
+        super().clear_caches()
+
+        self.closure_cache.clear()
+
+    def get_closure(self, pages: Iterable[int], /) -> Mapping[int, int]:
+        """
+        Get the bitmask of the pages that must (directly or indirectly) come after
+        each of the given pages, only considering the rules between them
+
+        Raises `RuleCycleError` if those rules contain a cycle.
+        """
+
+        mask: int = 0
+
+        page_number: int
+        for page_number in pages:
+            mask |= 1 << page_number
+
+        return self.closure_cache.get_or_compute(mask, lambda: self._get_closure(mask))
+
+    def _get_closure(self, mask: int, /) -> Mapping[int, int]:
+        closure: MutableMapping[int, int] = {
+            page_number: self.get_row(page_number) & mask
+            for page_number in iter_bits(mask)
+        }
+
+        # Warshall's algorithm, a row (bitmask) at a time: anything reachable from
+        # a page (via `middle_page`) is reachable from every page which reaches it
+        middle_page: int
+        for middle_page in closure:
+            page_number: int
+            for page_number in closure:
+                if closure[page_number] >> middle_page & 1:
+                    closure[page_number] |= closure[middle_page]
+
+        cycle: Sequence[int] = tuple(
+            page_number
+            for page_number, later_pages in closure.items()
+            if later_pages >> page_number & 1
+        )
+
+        if cycle:
+            raise RuleCycleError(cycle)
+
+        return closure
+
+    def must_precede(self, x: int, y: int, /, pages: Iterable[int]) -> bool:
+        """
+        Check whether page `x` must (directly or indirectly) come before page `y`,
+        given the pages that are present (e.g. those of an update)
+        """
+
+        return bool(self.get_closure(pages).get(x, 0) >> y & 1)
+
+    def check_updates(self, updates: Iterable[Update], /) -> None:
+        """
+        Check that the rules between the pages of each update are acyclic (so that
+        each can be fixed), raising `RuleCycleError` for the first that isn't
+        """
+
+        update: Update
+        for update in updates:
+            self.get_closure(update)
+
+
+@dataclass
+class RuleIndex:
+    """Read-only view of the bit-matrix rows of a (memory-mapped) rule index"""
+
+    buffer: Union[bytes, mmap.mmap] = field(repr=False)
+    rows: int
+    row_size: int
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __iter__(self) -> Iterator[int]:
+        return map(self.get_row, range(self.rows))
+
+    def get_row(self, page_number: int, /) -> int:
+        """Get the bitmask of the pages that *must* come after the given page"""
+
+        if page_number >= self.rows:
+            return 0
+
+        offset: int = INDEX_HEADER.size + page_number * self.row_size
+
+        return int.from_bytes(self.buffer[offset : offset + self.row_size], "little")
+
+    def close(self) -> None:
+        """Unmap the index (if memory-mapped)"""
+
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+
+def compile_rule_index(rule_machine: BaseRuleMachine, path: str, /) -> None:
+    """Compile the rules learnt by a rule machine into a binary rule index file"""
+
+    rows: Sequence[int] = rule_machine.get_bit_matrix()
+    row_size: int = max(1, (max(rows, default=0).bit_length() + 7) // 8)
+
+    body: bytes = b"".join(row.to_bytes(row_size, "little") for row in rows)
+    header: bytes = INDEX_HEADER.pack(
+        INDEX_MAGIC, INDEX_VERSION, row_size, len(rows), zlib.crc32(body)
+    )
 
-            return update
-        except RuleValidationError as error:
-            rule = error.rule
+    file: BinaryIO
+    with open(path, "wb") as file:
+        file.write(header + body)
 
-        # Create a (mutable) copy of the update so that we can move
-        # the contentious page.
-        new_update: MutableUpdate = [*update]
 
-        # Determine the locations of the x & y pages
-        x_index: int = update.index(rule.x)
-        y_index: int = update.index(rule.y)
+def load_rule_index(path: str, /, *, verify: bool = False) -> RuleIndex:
+    """
+    Load a rule index file by memory-mapping it (rows are only read when needed)
+
+    Only the header is read up-front, so loading takes constant time. If `verify`
+    is set, the checksum of the rows is also checked, which reads the whole file.
+    """
+
+    file: BinaryIO
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size < INDEX_HEADER.size:
+            raise RuleIndexError(path, "truncated header")
+
+        # The mapping remains valid once the file itself is closed
+        buffer: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic: bytes
+    version: int
+    row_size: int
+    rows: int
+    checksum: int
+    magic, version, row_size, rows, checksum = INDEX_HEADER.unpack_from(buffer)
+
+    reason: Optional[str] = None
+
+    if magic != INDEX_MAGIC:
+        reason = "not a rule index"
+    elif version != INDEX_VERSION:
+        reason = f"unsupported version {version}"
+    elif len(buffer) != INDEX_HEADER.size + rows * row_size:
+        reason = "unexpected size"
+    elif verify and zlib.crc32(memoryview(buffer)[INDEX_HEADER.size :]) != checksum:
+        reason = "checksum mismatch"
 
-        # Remove the problematic `x` page
-        new_update.pop(x_index)
+    if reason is not None:
+        buffer.close()
 
-        # Re-insert the problematic `x` page at a location that conforms
-        # to the specific failing rule.
-        new_update.insert(y_index, rule.x)
+        raise RuleIndexError(path, reason)
+
+    return RuleIndex(buffer, rows, row_size)
+
+
+@dataclass
+class IndexedRuleMachine(BitsetRuleMachine):
+    """
+    Bitset rule machine backed by a rule index, so that no rules need to be parsed
+
+    Rows are read from the index as needed, until a new rule is learnt, at which
+    point they're copied into memory (and the index is no longer used).
+    """
+
+    index: Optional[RuleIndex] = None
+
+    def learn(self, rule: Rule, /) -> None:
+        """Learn a given rule (affects all future update validations)"""
+
+        if self.index is not None:
+            self.rows = list(self.index)
+
+            self.index.close()
+            self.index = None
+
+        super().learn(rule)
+
+    def get_row(self, page_number: int, /) -> int:
+        """Get the bitmask of the pages that *must* come after the given page"""
+
+        if self.index is not None:
+            return self.index.get_row(page_number)
+
+        return super().get_row(page_number)
+
+    def get_bit_matrix(self) -> Sequence[int]:
+        """Get the learnt rules as rows of bitmasks of the pages after each page"""
+
+        if self.index is not None:
+            return list(self.index)
+
+        return super().get_bit_matrix()
+
+
+def pack_update_positions(
+    updates: Collection[Update], /, *, pages: int = 0
+) -> "np.ndarray":
+    """
+    Pack the page positions of updates into an (updates x 2 x pages) int array
+
+    Each entry is the first (then last) index of the page in the update, or -1 if
+    absent, using the smallest (signed) int type which fits the longest update.
+    """
+
+    assert np is not None, "NumPy is required for the NumPy-backed mode"
+
+    lengths: np.ndarray = np.fromiter(
+        map(len, updates), dtype=np.int64, count=len(updates)
+    )
+    count: int = int(lengths.sum())
+
+    rows: np.ndarray = np.repeat(np.arange(len(updates)), lengths)
+    page_numbers: np.ndarray = np.fromiter(
+        itertools.chain.from_iterable(updates), dtype=np.int64, count=count
+    )
+    indices: np.ndarray = np.arange(count) - np.repeat(
+        np.cumsum(lengths) - lengths, lengths
+    )
+
+    width: int = max(pages, int(page_numbers.max(initial=-1)) + 1)
+    dtype: np.dtype = np.min_scalar_type(-int(lengths.max(initial=1)))
+    positions: np.ndarray = np.full((len(updates), 2, width), -1, dtype=dtype)
+
+    positions[rows, :, page_numbers] = indices[:, np.newaxis]
+
+    # Only one of the positions of a repeated page is kept, so restore the first
+    # & last positions from those which clash with it
+    clashes: np.ndarray = positions[rows, 0, page_numbers] != indices
+
+    if clashes.any():
+        np.minimum.at(
+            positions[:, 0],
+            (rows[clashes], page_numbers[clashes]),
+            indices[clashes].astype(dtype),
+        )
+        np.maximum.at(
+            positions[:, 1],
+            (rows[clashes], page_numbers[clashes]),
+            indices[clashes].astype(dtype),
+        )
+
+    return positions
+
+
+def validate_updates_numpy(
+    rule_machine: BaseRuleMachine,
+    positions: "np.ndarray",
+    /,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Validate a batch of updates (packed by `pack_update_positions`) all at once
+
+    Each rule is checked against every update by comparing the position columns
+    of its pages: it's broken where page `y` first appears before page `x` last
+    does (which must then be present too), as with repeated pages in
+    `RuleMachine.validate`. Returns a validity vector, and an array of the rules
+    broken by each invalid update as (update index, x, y) rows.
+
+    Each batch is transposed, so that the positions of a page in every update are
+    contiguous, and gathering them for each rule is a straight copy.
+    """
 
-        # Now that we've moved the contentious page, attempt to fix the update again.
-        return self.fix(new_update)
+    assert np is not None, "NumPy is required for the NumPy-backed mode"
+
+    size: int
+    width: int
+    size, _, width = positions.shape
+
+    # Rules for pages which never appear (outside the matrix) can't be broken
+    rules: np.ndarray = np.array(
+        [
+            (page_number, later_page)
+            for page_number, row in enumerate(rule_machine.get_bit_matrix()[:width])
+            for later_page in iter_bits(row)
+            if later_page < width
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 2)
+
+    valid: np.ndarray = np.ones(size, dtype=bool)
+    violations: MutableSequence[np.ndarray] = [np.empty((0, 3), dtype=np.int64)]
+
+    start: int
+    for start in range(0, size, batch_size):
+        # (2 x pages x updates)
+        batch: np.ndarray = np.ascontiguousarray(
+            positions[start : start + batch_size].transpose(1, 2, 0)
+        )
+
+        # (rules x updates)
+        x_positions: np.ndarray = batch[1, rules[:, 0]]
+        y_positions: np.ndarray = batch[0, rules[:, 1]]
+        broken: np.ndarray = (y_positions >= 0) & (y_positions < x_positions)
+
+        valid[start : start + batch.shape[2]] = ~broken.any(axis=0)
+
+        rule_indices: np.ndarray
+        update_indices: np.ndarray
+        rule_indices, update_indices = np.divmod(np.flatnonzero(broken), batch.shape[2])
+
+        # Group the broken rules by update (a radix sort, for small enough batches)
+        order: np.ndarray = np.argsort(
+            update_indices.astype(np.min_scalar_type(batch.shape[2])), kind="stable"
+        )
+        rule_indices, update_indices = rule_indices[order], update_indices[order]
+
+        violations.append(
+            np.column_stack((update_indices + start, rules[rule_indices]))
+        )
+
+    return valid, np.concatenate(violations)
 
 
 def main() -> None: